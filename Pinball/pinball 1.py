@@ -6,12 +6,31 @@
 #   SPACE (release) -> Launch Ball
 #   ENTER         -> Select / Confirm (menus & name entry)
 #   ESC           -> Pause (in-game) / Back (menus)
+#   F3            -> Physics debug counters (in-game)
 #
 # Requirements:
 #   pip install pygame
 #
 # Notes:
 # - Saves top 10 high scores to ./saves/highscores.json
+# - Completing the P-B-P top lanes starts multiball; --balls N starts every
+#   game with N balls on the table (stress test).
+# - --table FILE plays a table file (JSON, see classic_table).
+#   --export-table FILE writes the built-in one.
+# - --record FILE saves the inputs of each finished game, one file per game
+#   (FILE-1, FILE-2, ... taking the next free number); --replay FILE
+#   re-simulates one without a window on the same table and checks the
+#   final score.
+# - --bench-physics [FILE] runs canned headless sessions and writes ticks/s
+#   and per-subsystem tests, time and peak transient memory per tick to FILE
+#   (default ./saves/bench_physics.json).
+# - --autoplay GAMES [FILE] lets the autoplayer play GAMES headless games
+#   across a process pool (--workers K, --seed S) and writes the score
+#   spread, drain rates and per-piece hit counts to FILE
+#   (default ./saves/autoplay.json).
+# - --bench-collision times the ball-wall collision kernel against the
+#   generic segment helpers, checks how far multi-tick traces through
+#   each drift apart, and exits.
 # - Portrait playfield (720x1280). Easily adjustable.
 # - Silver ball rendering (simple highlight & rim).
 # - Classic geometry: shooter lane w/ one-way gate, slings, bumpers,
@@ -24,20 +43,85 @@
 import os
 import sys
 import json
+import argparse
+import atexit
+import heapq
 import math
+import hashlib
+import multiprocessing
 import random
+import time
+import threading
+import tracemalloc
 import pygame
+from array import array
 from datetime import datetime
 
+# -------------------------------
+# Command line
+# -------------------------------
+def positive_int(text):
+    # argparse type: an int of at least 1
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a whole number: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+def parse_args(argv=None):
+    # Every command-line flag (see the notes at the top). A missing or bad
+    # value, or an unknown flag, exits with a usage message before the
+    # window opens.
+    parser = argparse.ArgumentParser(prog="pinball 1.py", description=f"{GAME_TITLE}: a single-file pygame pinball game.")
+    parser.add_argument("--balls", type=positive_int, default=1, metavar="N",
+                        help="balls on the table at the start of every game (stress test)")
+    parser.add_argument("--table", metavar="FILE", help="play this table file instead of the built-in table")
+    parser.add_argument("--record", metavar="FILE",
+                        help="save each finished game's inputs to FILE-1, FILE-2, ... (next free numbers)")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--replay", metavar="FILE", help="re-simulate a recorded game and check its final score")
+    modes.add_argument("--export-table", metavar="FILE", help="write the built-in table to FILE as a table file")
+    modes.add_argument("--bench-collision", action="store_true",
+                       help="time the ball-wall collision kernel against the segment helpers")
+    modes.add_argument("--bench-physics", nargs="?", const="", metavar="FILE",
+                       help="run canned headless sessions and write the timings to FILE "
+                            "(default ./saves/bench_physics.json)")
+    modes.add_argument("--autoplay", nargs="+", metavar=("GAMES", "FILE"),
+                       help="let the autoplayer play GAMES headless games and write their stats to FILE "
+                            "(default ./saves/autoplay.json)")
+    parser.add_argument("--workers", type=positive_int, help="--autoplay worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first --autoplay game (default 1)")
+    args = parser.parse_args(argv)
+    if args.autoplay is not None:
+        if len(args.autoplay) > 2:
+            parser.error("argument --autoplay: expected GAMES and at most one FILE")
+        try:
+            games = positive_int(args.autoplay[0])
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"argument --autoplay: GAMES {e}")
+        args.autoplay, args.autoplay_file = games, args.autoplay[1] if len(args.autoplay) > 1 else None
+    return args
+
+GAME_TITLE = "PINBALL PINBALL"
+ARGS = parse_args()
+
 # -------------------------------
 # Config & Globals
 # -------------------------------
+HEADLESS = bool(ARGS.replay or ARGS.bench_collision or ARGS.bench_physics is not None or ARGS.export_table
+                or ARGS.autoplay)
+if HEADLESS:
+    # No window or sound needed: run on SDL's dummy drivers
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
 pygame.init()
-GAME_TITLE = "PINBALL PINBALL"
 VERSION = "0.1.0"
 W, H = 720, 1280  # portrait table
 FPS = 120
-DT = 1.0 / FPS
+DT = 1.0 / FPS  # every physics tick is exactly this long
+MAX_FRAME_TIME = 0.25  # most real time simulated after a stall (drops the rest)
 
 # Physics
 GRAVITY = 2400.0
@@ -46,11 +130,18 @@ BALL_RADIUS = 14
 BALL_RESTITUTION = 0.90
 WALL_RESTITUTION = 0.96
 FLIPPER_RESTITUTION = 1.03
-SLING_KICK = 950.0
-BUMPER_KICK = 720.0
+SLING_KICK = 500.0
+BUMPER_KICK = 300.0
+BUMPER_RESTITUTION = 0.8  # below 1, so a chain of bumper hits can't keep speeding up
+MAX_BALL_SPEED = 4000.0  # above a full plunger launch (2470), below what MAX_SUBSTEPS covers
+SUBSTEP_TRAVEL = BALL_RADIUS * 0.5  # most a ball may move in one substep
+MAX_SUBSTEPS = 8  # cap per tick; past it the swept tests still stop tunneling
 
 # Gameplay
 BALLS_PER_GAME = 3
+MULTIBALL_EXTRA = 2  # balls added when the top lanes are completed
+START_BALLS = ARGS.balls  # balls on the table at the start of a game (--balls N for stress tests)
+RECORD_PATH = ARGS.record  # --record FILE saves each finished game's inputs (FILE-1, FILE-2, ...) for --replay
 EXTRA_BALL_THRESHOLD = 100_000
 ROLL_OVER_BONUS = 2500  # for completing all three
 TOP_LANE_SCORE = 500
@@ -85,6 +176,8 @@ UI_FONT_HUGE = pygame.font.SysFont("consolas", 64, bold=True)
 # Saves
 SAVE_DIR = os.path.join(os.getcwd(), "saves")
 HS_PATH = os.path.join(SAVE_DIR, "highscores.json")
+HS_WRITE_DELAY = 0.5  # seconds the high-score writer waits for more saves before writing
+TABLE_PATH = ARGS.table  # --table FILE plays that table instead of the built-in one
 os.makedirs(SAVE_DIR, exist_ok=True)
 
 # Scenes
@@ -131,96 +224,351 @@ def proj_point_on_segment(p, a, b):
     q = (a[0] + ab[0]*t, a[1] + ab[1]*t)
     return q, t
 
+def circle_ray_toi(p0, d, c, r):
+    # First t in [0, 1] where p0 + d*t is within r of point c, or None
+    fx, fy = p0[0]-c[0], p0[1]-c[1]
+    a = d[0]*d[0] + d[1]*d[1]
+    if a == 0:
+        return None
+    b = fx*d[0] + fy*d[1]
+    cc = fx*fx + fy*fy - r*r
+    disc = b*b - a*cc
+    if disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    return t if 0.0 <= t <= 1.0 else None
+
+def segment_toi(p0, p1, r, a, b):
+    # Swept circle vs segment: first t in [0, 1] at which a circle of radius r
+    # moving from p0 to p1 touches segment a-b, or None if it never does.
+    d = (p1[0]-p0[0], p1[1]-p0[1])
+    n = seg_normal(a, b)
+    best = None
+    # Flat sides: when the distance to the line reaches r on p0's side
+    s0 = dot((p0[0]-a[0], p0[1]-a[1]), n)
+    s1 = dot((p1[0]-a[0], p1[1]-a[1]), n)
+    side = r if s0 >= 0 else -r
+    if (s0 - side) * (s1 - side) < 0:
+        t = (s0 - side) / (s0 - s1)
+        if 0.0 <= t <= 1.0:
+            q, u = proj_point_on_segment((p0[0] + d[0]*t, p0[1] + d[1]*t), a, b)
+            if 0.0 < u < 1.0:
+                best = t
+    # Rounded ends
+    for c in (a, b):
+        t = circle_ray_toi(p0, d, c, r)
+        if t is not None and (best is None or t < best):
+            best = t
+    return best
+
+def _ray_circle_toi(x0, y0, mx, my, a, cx, cy, r):
+    # circle_ray_toi on plain floats (a = mx*mx + my*my > 0); -1.0 for a miss
+    fx, fy = x0 - cx, y0 - cy
+    b = fx*mx + fy*my
+    disc = b*b - a*(fx*fx + fy*fy - r*r)
+    if disc < 0:
+        return -1.0
+    t = (-b - math.sqrt(disc)) / a
+    return t if 0.0 <= t <= 1.0 else -1.0
+
+def collide_segment(w, arrays, i, r, restitution, kick=0.0, swept=False):
+    # Circle (ball i of the (px, py, vx, vy, ox, oy) arrays, radius r) against
+    # compiled Wall w. Equivalent to the segment_toi/proj_point_on_segment
+    # version up to floating-point ordering, but reads and writes the arrays
+    # directly and builds no tuples.
+    # Returns True if the ball bounced off.
+    px, py, vx, vy, ox, oy = arrays
+    x, y = px[i], py[i]
+    reach = r + 1.0
+    if swept:
+        x0, y0 = ox[i], oy[i]
+        if (min(x0, x) - reach > w.x1 or max(x0, x) + reach < w.x0 or
+                min(y0, y) - reach > w.y1 or max(y0, y) + reach < w.y0):
+            return False
+        # Back the ball up to where it first touched the wall this step, so it
+        # can't end up overlapping from (or beyond) the far side
+        mx, my = x - x0, y - y0
+        best = -1.0
+        s0 = (x0 - w.ax)*w.nx + (y0 - w.ay)*w.ny
+        s1 = (x - w.ax)*w.nx + (y - w.ay)*w.ny
+        side = r if s0 >= 0 else -r
+        if (s0 - side) * (s1 - side) < 0:
+            t = (s0 - side) / (s0 - s1)
+            u = ((x0 + mx*t - w.ax)*w.dx + (y0 + my*t - w.ay)*w.dy) * w.inv_len2
+            if 0.0 < u < 1.0:
+                best = t
+        a = mx*mx + my*my
+        if a > 0:
+            t = _ray_circle_toi(x0, y0, mx, my, a, w.ax, w.ay, r)
+            if t >= 0.0 and (best < 0.0 or t < best):
+                best = t
+            t = _ray_circle_toi(x0, y0, mx, my, a, w.bx, w.by, r)
+            if t >= 0.0 and (best < 0.0 or t < best):
+                best = t
+        if best >= 0.0:
+            x = px[i] = x0 + mx*best
+            y = py[i] = y0 + my*best
+    elif x - reach > w.x1 or x + reach < w.x0 or y - reach > w.y1 or y + reach < w.y0:
+        return False
+
+    t = ((x - w.ax)*w.dx + (y - w.ay)*w.dy) * w.inv_len2
+    t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+    ddx = x - (w.ax + w.dx*t)
+    ddy = y - (w.ay + w.dy*t)
+    dist2 = ddx*ddx + ddy*ddy
+    if dist2 >= (r + 1e-6) * (r + 1e-6):
+        return False
+    dist = math.sqrt(dist2)
+    if dist > 1e-6:
+        nx, ny = ddx/dist, ddy/dist
+    else:
+        nx, ny = w.nx, w.ny
+    push = r - dist + 0.5
+    px[i] = x + nx*push
+    py[i] = y + ny*push
+    vn = vx[i]*nx + vy[i]*ny
+    if vn >= 0.0:  # Only bounce if still heading into the wall
+        return False
+    vx[i] -= (1+restitution)*vn*nx - nx*kick
+    vy[i] -= (1+restitution)*vn*ny - ny*kick
+    return True
+
 def draw_text_center(surf, text, font, color, center):
     obj = font.render(text, True, color)
     rect = obj.get_rect(center=center)
-    surf.blit(obj, rect)
+    return surf.blit(obj, rect)
+
+BALL_SPRITES = {}  # radius -> pre-rendered silver ball
+
+def ball_sprite(r):
+    # The silver ball drawn once per radius onto a transparent surface,
+    # centered at (r, r)
+    sprite = BALL_SPRITES.get(r)
+    if sprite is None:
+        sprite = pygame.Surface((r*2+1, r*2+1), pygame.SRCALPHA)
+        # Base
+        pygame.draw.circle(sprite, (210, 210, 215), (r, r), r)
+        # Rim
+        pygame.draw.circle(sprite, (120, 125, 135), (r, r), r, 2)
+        # Gradient inner ring
+        pygame.draw.circle(sprite, (235, 235, 240), (r, r), max(1, r-4))
+        # Highlight
+        hilite = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
+        pygame.draw.circle(hilite, (255, 255, 255, 120), (int(r*0.7), int(r*0.6)), r//3)
+        pygame.draw.circle(hilite, (255, 255, 255, 80), (int(r*0.9), int(r*0.9)), r//4)
+        sprite.blit(hilite, (0, 0))
+        sprite = BALL_SPRITES[r] = sprite.convert_alpha()
+    return sprite
 
 def draw_silver_ball(surf, pos, r):
-    # Base
-    pygame.draw.circle(surf, (210, 210, 215), (int(pos[0]), int(pos[1])), r)
-    # Rim
-    pygame.draw.circle(surf, (120, 125, 135), (int(pos[0]), int(pos[1])), r, 2)
-    # Gradient inner ring
-    pygame.draw.circle(surf, (235, 235, 240), (int(pos[0]), int(pos[1])), max(1, r-4))
-    # Highlight
-    hilite = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-    pygame.draw.circle(hilite, (255, 255, 255, 120), (int(r*0.7), int(r*0.6)), r//3)
-    pygame.draw.circle(hilite, (255, 255, 255, 80), (int(r*0.9), int(r*0.9)), r//4)
-    surf.blit(hilite, (int(pos[0]-r), int(pos[1]-r)))
+    # One blit of the cached sprite
+    return surf.blit(ball_sprite(r), (int(pos[0])-r, int(pos[1])-r))
 
 # -------------------------------
 # High Scores
 # -------------------------------
 class HighScores:
+    # Top max_records scores. The lowest sits at the top of a min-heap, so
+    # qualifies() is one comparison. save() hands a copy of the records to a
+    # background thread that writes a temp file and renames it over the old
+    # one, so a scene change never waits on the disk; saves made while one
+    # is still waiting replace it, so a burst of adds is written once.
     def __init__(self, path, max_records=10):
         self.path = path
         self.max_records = max_records
-        self.records = []
+        self.heap = []  # (score, -order, record): lowest score, newest on ties, first
+        self.order = 0  # records added so far (ties keep the older record)
+        self.records = []  # best first, for display
+        self.pending = None  # records waiting to be written
+        self.writing = False
+        self.lock = threading.Condition()
+        self.writer = None  # started by the first save()
         self.load()
 
     def load(self):
         try:
             with open(self.path, "r", encoding="utf-8") as f:
-                self.records = json.load(f)
+                records = json.load(f)
         except Exception:
-            self.records = []
+            records = []
+        self.heap = []
+        for record in records:
+            self.push(record)
+        self.records = [entry[2] for entry in sorted(self.heap, reverse=True)]
+
+    def push(self, record):
+        self.order += 1
+        entry = (record["score"], -self.order, record)
+        if len(self.heap) < self.max_records:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heappushpop(self.heap, entry)
 
     def save(self):
-        try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self.records, f, indent=2)
-        except Exception:
-            pass
+        with self.lock:
+            self.pending = [dict(r) for r in self.records]
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_loop, name="highscores", daemon=True)
+                self.writer.start()
+                atexit.register(self.flush)
+            self.lock.notify_all()
+
+    def write_loop(self):
+        while True:
+            with self.lock:
+                while self.pending is None:
+                    self.lock.wait()
+            time.sleep(HS_WRITE_DELAY)  # let a burst of saves become one write
+            with self.lock:
+                records, self.pending = self.pending, None
+                self.writing = True
+            try:
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(records, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except Exception:
+                pass
+            with self.lock:
+                self.writing = False
+                self.lock.notify_all()
+
+    def flush(self):
+        # Wait until every save so far is on disk (run at exit)
+        with self.lock:
+            while self.pending is not None or self.writing:
+                self.lock.wait()
 
     def qualifies(self, score):
         if score <= 0:
             return False
-        if len(self.records) < self.max_records:
-            return True
-        return score > min(r["score"] for r in self.records)
+        return len(self.heap) < self.max_records or score > self.heap[0][0]
 
     def add(self, name, score):
-        self.records.append({
+        self.push({
             "name": name[:3].upper(),
             "score": int(score),
             "date": datetime.now().strftime("%Y-%m-%d")
         })
-        self.records.sort(key=lambda r: r["score"], reverse=True)
-        self.records = self.records[:self.max_records]
+        self.records = [entry[2] for entry in sorted(self.heap, reverse=True)]
         self.save()
 
 HS = HighScores(HS_PATH, max_records=10)
 
+# -------------------------------
+# Replays
+# -------------------------------
+class Replay:
+    # One game's inputs: (tick, control, down) for every press and release.
+    # The physics only depend on these and the table, so replaying them tick
+    # for tick on the same table reproduces the game exactly.
+    VERSION = 2  # 2: added the table digest
+
+    def __init__(self, start_balls=1, events=None, ticks=0, score=0, table=None):
+        self.start_balls = start_balls
+        self.events = events if events is not None else []
+        self.ticks = ticks  # length of the game in physics ticks
+        self.score = score  # final score, checked on playback
+        self.table = table  # Table.digest of the table played (None in version 1 files)
+
+    def record(self, tick, control, down):
+        self.events.append((tick, control, bool(down)))
+
+    def save(self, path, ticks, score):
+        self.ticks = ticks
+        self.score = score
+        data = {
+            "version": self.VERSION,
+            "start_balls": self.start_balls,
+            "table": self.table,
+            "ticks": ticks,
+            "score": score,
+            "events": [[tick, control, int(down)] for tick, control, down in self.events],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") not in (1, cls.VERSION):
+            raise ValueError(f"{path}: unsupported replay version {data.get('version')}")
+        events = [(tick, control, bool(down)) for tick, control, down in data["events"]]
+        return cls(data["start_balls"], events, data["ticks"], data["score"], data.get("table"))
+
+def next_record_path(path):
+    # path with the first free "-N" (N = 1, 2, ...) added before its extension,
+    # so every recorded game of every session gets a file of its own
+    base, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(f"{base}-{n}{ext}"):
+        n += 1
+    return f"{base}-{n}{ext}"
+
 # -------------------------------
 # Geometry Objects
 # -------------------------------
+def collide_circle(cx, cy, cr, arrays, i, r, restitution, kick=0.0):
+    # Ball i of the arrays (radius r) against a fixed circle at (cx, cy) of
+    # radius cr: collide_segment's counterpart for bumpers, reading and
+    # writing the arrays directly. Returns True if the ball bounced off.
+    px, py, vx, vy = arrays[:4]
+    dx, dy = px[i] - cx, py[i] - cy
+    reach = r + cr
+    if dx*dx + dy*dy >= reach*reach:
+        return False
+    dist = math.hypot(dx, dy)
+    if dist > 1e-6:
+        nx, ny = dx/dist, dy/dist
+    else:
+        nx, ny = 0.0, -1.0
+    push = reach - dist + 0.5
+    px[i] += nx*push
+    py[i] += ny*push
+    vn = vx[i]*nx + vy[i]*ny
+    if vn >= 0.0:  # Only bounce if still heading into the circle
+        return False
+    vx[i] = vx[i] - (1+restitution)*vn*nx + nx*kick
+    vy[i] = vy[i] - (1+restitution)*vn*ny + ny*kick
+    return True
+
 class Wall:
+    # Static segment, compiled once: start, direction, 1/length^2, unit normal
+    # and bounding box are kept as plain floats so collide_segment never
+    # has to rebuild them (or allocate tuples) per test.
     def __init__(self, a, b, restitution=WALL_RESTITUTION):
         self.a = a
         self.b = b
         self.n = seg_normal(a, b)  # left-hand normal
         self.restitution = restitution
-
-    def collide(self, ball):
-        q, t = proj_point_on_segment(ball.p, self.a, self.b)
-        d = (ball.p[0]-q[0], ball.p[1]-q[1])
-        dist = vlen(d)
-        if dist < ball.r:
-            n = vnorm(d) if dist > 1e-6 else self.n
-            push = ball.r - dist + 0.5
-            ball.p[0] += n[0]*push
-            ball.p[1] += n[1]*push
-            ball.v = list(reflect(ball.v, n, self.restitution))
+        self.ax, self.ay = float(a[0]), float(a[1])
+        self.bx, self.by = float(b[0]), float(b[1])
+        self.dx, self.dy = self.bx - self.ax, self.by - self.ay
+        len2 = self.dx*self.dx + self.dy*self.dy
+        self.inv_len2 = 1.0/len2 if len2 > 0 else 0.0
+        self.nx, self.ny = self.n
+        self.x0, self.y0 = min(self.ax, self.bx), min(self.ay, self.by)
+        self.x1, self.y1 = max(self.ax, self.bx), max(self.ay, self.by)
+
+    def collide(self, ball, swept=False):
+        # swept: also sweep the ball from where it was before the last step
+        collide_segment(self, ball.arrays, ball.index, ball.r, self.restitution, 0.0, swept)
+
+    def bounds(self):
+        return (self.x0, self.y0, self.x1, self.y1)
 
     def draw(self, surf, color=GREY, width=3):
-        pygame.draw.line(surf, color, self.a, self.b, width)
+        return pygame.draw.line(surf, color, self.a, self.b, width)
 
 class OneWayWall(Wall):
     # Only collides if ball is moving into the "blocked" side (dot(v, n)<0)
-    def collide(self, ball):
-        if dot(ball.v, self.n) < 0.0:
-            super().collide(ball)
+    def collide(self, ball, swept=False):
+        i = ball.index
+        if ball.arrays[2][i]*self.nx + ball.arrays[3][i]*self.ny < 0.0:
+            super().collide(ball, swept)
 
 class CircleBumper:
     def __init__(self, pos, r=34, score=BUMPER_SCORE, kick=BUMPER_KICK, color=(200, 220, 255)):
@@ -232,23 +580,21 @@ class CircleBumper:
         self.flash = 0.0
 
     def collide(self, game, ball):
-        d = (ball.p[0]-self.pos[0], ball.p[1]-self.pos[1])
-        dist = vlen(d)
-        if dist < (ball.r + self.r):
-            n = vnorm(d) if dist > 1e-6 else (0.0, -1.0)
-            push = (ball.r + self.r) - dist + 0.5
-            ball.p[0] += n[0]*push
-            ball.p[1] += n[1]*push
-            ball.v = list(reflect(ball.v, n, 1.02))
-            ball.v[0] += n[0]*self.kick
-            ball.v[1] += n[1]*self.kick
+        if collide_circle(self.pos[0], self.pos[1], self.r, ball.arrays, ball.index, ball.r, BUMPER_RESTITUTION, self.kick):
             self.flash = 0.12
-            game.add_score(self.score)
+            game.hit(self)
+
+    def bounds(self):
+        return (self.pos[0]-self.r, self.pos[1]-self.r, self.pos[0]+self.r, self.pos[1]+self.r)
+
+    def lit(self):
+        return self.flash > 0
 
     def draw(self, surf):
-        col = ACCENT if self.flash > 0 else self.color
-        pygame.draw.circle(surf, col, (int(self.pos[0]), int(self.pos[1])), self.r, 0)
+        col = ACCENT if self.lit() else self.color
+        rect = pygame.draw.circle(surf, col, (int(self.pos[0]), int(self.pos[1])), self.r, 0)
         pygame.draw.circle(surf, DARK, (int(self.pos[0]), int(self.pos[1])), self.r, 2)
+        return rect
 
 class SlingShot:
     def __init__(self, p1, p2, p3, kick=SLING_KICK, score=SLING_SCORE):
@@ -258,29 +604,27 @@ class SlingShot:
         self.score = score
         self.flash = 0.0
 
-    def collide(self, game, ball):
+    def collide(self, game, ball, swept=False):
         hit = False
         for e in self.edges:
-            q, t = proj_point_on_segment(ball.p, e.a, e.b)
-            d = (ball.p[0]-q[0], ball.p[1]-q[1])
-            dist = vlen(d)
-            if dist < ball.r + 8:
-                n = vnorm(d) if dist > 1e-6 else e.n
-                push = (ball.r + 8) - dist + 0.5
-                ball.p[0] += n[0]*push
-                ball.p[1] += n[1]*push
-                ball.v = list(reflect(ball.v, n, 1.0))
-                ball.v[0] += n[0]*self.kick
-                ball.v[1] += n[1]*self.kick
+            if collide_segment(e, ball.arrays, ball.index, ball.r + 8, 1.0, self.kick, swept):
                 hit = True
         if hit:
             self.flash = 0.1
-            game.add_score(self.score)
+            game.hit(self)
+
+    def bounds(self):
+        xs = [p[0] for p in self.pts]
+        ys = [p[1] for p in self.pts]
+        return (min(xs)-8, min(ys)-8, max(xs)+8, max(ys)+8)  # edges collide 8px out
+
+    def lit(self):
+        return self.flash > 0
 
     def draw(self, surf):
-        col = NEON2 if self.flash > 0 else GREY
+        col = NEON2 if self.lit() else GREY
         pygame.draw.polygon(surf, DARK, self.pts, 0)
-        pygame.draw.polygon(surf, col, self.pts, 3)
+        return pygame.draw.polygon(surf, col, self.pts, 3)
 
 class Rollover:
     # Sensor circle for scoring top lanes or inlane entries
@@ -297,17 +641,24 @@ class Rollover:
         if d[0]*d[0] + d[1]*d[1] < (ball.r + self.r)*(ball.r + self.r):
             if not self.active:
                 self.active = True
-                game.add_score(self.score)
+                game.hit(self)
                 self.flash = 0.18
 
     def reset(self):
         self.active = False
 
+    def bounds(self):
+        return (self.pos[0]-self.r, self.pos[1]-self.r, self.pos[0]+self.r, self.pos[1]+self.r)
+
+    def lit(self):
+        return self.flash > 0 or self.active
+
     def draw(self, surf):
-        col = NEON1 if (self.flash > 0 or self.active) else GREY
-        pygame.draw.circle(surf, col, (int(self.pos[0]), int(self.pos[1])), self.r, 3)
+        col = NEON1 if self.lit() else GREY
+        rect = pygame.draw.circle(surf, col, (int(self.pos[0]), int(self.pos[1])), self.r, 3)
         if self.label:
-            draw_text_center(surf, self.label, UI_FONT, col, (int(self.pos[0]), int(self.pos[1])-28))
+            rect = rect.union(draw_text_center(surf, self.label, UI_FONT, col, (int(self.pos[0]), int(self.pos[1])-28)))
+        return rect
 
 class StandupTarget:
     # Short vertical segment that scores and bounces
@@ -316,17 +667,24 @@ class StandupTarget:
         self.score = score
         self.flash = 0.0
 
-    def collide(self, game, ball):
-        before = (ball.v[0], ball.v[1])
-        self.wall.collide(ball)
+    def collide(self, game, ball, swept=False):
+        vx, vy, i = ball.arrays[2], ball.arrays[3], ball.index
+        before_x, before_y = vx[i], vy[i]
+        self.wall.collide(ball, swept)
         # If velocity meaningfully changed, award score
-        if (abs(ball.v[0]-before[0]) + abs(ball.v[1]-before[1])) > 5.0:
+        if (abs(vx[i]-before_x) + abs(vy[i]-before_y)) > 5.0:
             self.flash = 0.12
-            game.add_score(self.score)
+            game.hit(self)
+
+    def bounds(self):
+        return self.wall.bounds()
+
+    def lit(self):
+        return self.flash > 0
 
     def draw(self, surf):
-        color = YELLOW if self.flash > 0 else GREY
-        self.wall.draw(surf, color=color, width=5)
+        color = YELLOW if self.lit() else GREY
+        return self.wall.draw(surf, color=color, width=5)
 
 class Flipper:
     def __init__(self, pivot, length, base_angle_deg, swing_deg, side='L'):
@@ -337,16 +695,24 @@ class Flipper:
         self.side = side
         self.keydown = False
         self.ang = self.base
+        self.prev_ang = self.base  # angle at the start of the current tick
         self.ang_vel = 0.0
         self.max_speed = 16.0
         self.return_speed = 10.0
         self.width = 18
 
+    def reset(self):
+        self.keydown = False
+        self.ang = self.base
+        self.prev_ang = self.base
+        self.ang_vel = 0.0
+
     def update(self, dt):
         target = self.base - (self.swing if self.keydown else 0.0)
         diff = target - self.ang
         speed = self.max_speed if self.keydown else self.return_speed
         self.ang_vel = clamp(diff/dt, -speed, speed) if abs(diff) > 1e-3 else 0.0
+        self.prev_ang = self.ang
         self.ang += self.ang_vel * dt
 
     def tip(self):
@@ -356,61 +722,415 @@ class Flipper:
     def segment(self):
         return self.pivot, self.tip()
 
-    def collide(self, ball):
-        a, b = self.segment()
-        q, t = proj_point_on_segment(ball.p, a, b)
-        d = (ball.p[0]-q[0], ball.p[1]-q[1])
-        dist = vlen(d)
-        effective_r = ball.r + self.width*0.5
-        if dist < effective_r:
-            n = vnorm(d) if dist > 1e-6 else seg_normal(a, b)
-            push = effective_r - dist + 0.5
-            ball.p[0] += n[0]*push
-            ball.p[1] += n[1]*push
-            # Add flipper angular velocity influence
-            tangential = self.ang_vel * self.length
-            add = ( -math.sin(self.ang)*tangential, math.cos(self.ang)*tangential )
-            v_rel = (ball.v[0] - add[0], ball.v[1] - add[1])
-            vr = reflect(v_rel, n, FLIPPER_RESTITUTION)
-            ball.v = [vr[0] + add[0], vr[1] + add[1]]
-            # Ensure reasonable upward action
-            speed = vlen(ball.v)
-            if speed < 380:
-                ball.v[0] += n[0]*260
-                ball.v[1] += n[1]*260
+    def bounds(self):
+        # Everything the flipper can reach over its whole swing
+        reach = self.length + self.width*0.5
+        return (self.pivot[0]-reach, self.pivot[1]-reach, self.pivot[0]+reach, self.pivot[1]+reach)
+
+    def gap(self, x, y, ang, reach):
+        # Distance from (x, y) to the flipper's surface at angle ang (negative
+        # when closer than reach), and how far along the flipper it is (0-1)
+        ux, uy = math.cos(ang), math.sin(ang)
+        t = ((x - self.pivot[0])*ux + (y - self.pivot[1])*uy) / self.length
+        t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+        dx = x - (self.pivot[0] + ux*self.length*t)
+        dy = y - (self.pivot[1] + uy*self.length*t)
+        return math.hypot(dx, dy) - reach, t
+
+    def collide(self, ball, start=0.0, end=1.0):
+        # The flipper turns from prev_ang to ang over the tick; this substep
+        # covers the part from `start` to `end` (fractions of the tick) while
+        # the ball moves from where it was to where it is. Both are swept
+        # together so a fast flipper can't pass through the ball.
+        px, py, vx, vy, ox, oy = ball.arrays
+        i = ball.index
+        x0, y0, x1, y1 = ox[i], oy[i], px[i], py[i]
+        turn = self.ang - self.prev_ang
+        a0 = self.prev_ang + turn*start
+        a1 = self.prev_ang + turn*end
+        reach = ball.r + self.width*0.5
+
+        # Sample the sweep finely enough that neither the ball nor the tip
+        # moves half the reach between samples, then bisect the first contact
+        move = max(math.hypot(x1 - x0, y1 - y0), abs(a1 - a0)*self.length)
+        steps = max(1, math.ceil(move / (reach*0.5)))
+        before = 0.0
+        hit = None
+        for k in range(steps + 1):
+            s = k / steps
+            if self.gap(x0 + (x1 - x0)*s, y0 + (y1 - y0)*s, a0 + (a1 - a0)*s, reach)[0] < 0.0:
+                hit = s
+                break
+            before = s
+        if hit is None:
+            return
+        if hit > 0.0:
+            for _ in range(8):
+                mid = (before + hit) * 0.5
+                if self.gap(x0 + (x1 - x0)*mid, y0 + (y1 - y0)*mid, a0 + (a1 - a0)*mid, reach)[0] < 0.0:
+                    hit = mid
+                else:
+                    before = mid
+
+        # Resolve at the contact: ball and flipper where they first touched
+        x, y = x0 + (x1 - x0)*hit, y0 + (y1 - y0)*hit
+        ang = a0 + (a1 - a0)*hit
+        gap, t = self.gap(x, y, ang, reach)
+        ux, uy = math.cos(ang), math.sin(ang)
+        qx = self.pivot[0] + ux*self.length*t
+        qy = self.pivot[1] + uy*self.length*t
+        dist = gap + reach
+        if dist > 1e-6:
+            nx, ny = (x - qx)/dist, (y - qy)/dist
+        else:
+            nx, ny = -uy, ux
+        push = reach - dist + 0.5
+        px[i] = x + nx*push
+        py[i] = y + ny*push
+        # The flipper's surface velocity where it touches the ball
+        sx = -self.ang_vel * (qy - self.pivot[1])
+        sy = self.ang_vel * (qx - self.pivot[0])
+        rel_x, rel_y = vx[i] - sx, vy[i] - sy
+        vn = rel_x*nx + rel_y*ny
+        if vn < 0.0:
+            vx[i] = rel_x - (1+FLIPPER_RESTITUTION)*vn*nx + sx
+            vy[i] = rel_y - (1+FLIPPER_RESTITUTION)*vn*ny + sy
+            # Ensure reasonable upward action from a swinging flipper
+            if math.hypot(vx[i], vy[i]) < 380 and self.ang_vel != 0.0:
+                vx[i] += nx*260
+                vy[i] += ny*260
 
     def draw(self, surf, color=WHITE):
         a, b = self.segment()
-        pygame.draw.line(surf, color, a, b, self.width)
-        pygame.draw.circle(surf, color, (int(a[0]), int(a[1])), self.width//2)
-        pygame.draw.circle(surf, color, (int(b[0]), int(b[1])), self.width//2)
+        rect = pygame.draw.line(surf, color, a, b, self.width)
+        rect.union_ip(pygame.draw.circle(surf, color, (int(a[0]), int(a[1])), self.width//2))
+        rect.union_ip(pygame.draw.circle(surf, color, (int(b[0]), int(b[1])), self.width//2))
+        return rect
+
+class BallVec:
+    # A ball's position or velocity as an indexable pair, read from and
+    # written straight into its BallSet's arrays (so ball.p[0] += x works).
+    __slots__ = ("ball", "offset")
+
+    def __init__(self, ball, offset):
+        self.ball = ball
+        self.offset = offset
+
+    def __getitem__(self, k):
+        b = self.ball
+        return b.arrays[self.offset + k][b.index]
+
+    def __setitem__(self, k, value):
+        b = self.ball
+        b.arrays[self.offset + k][b.index] = value
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        yield self[0]
+        yield self[1]
+
+    def __repr__(self):
+        return f"[{self[0]}, {self[1]}]"
 
 class Ball:
-    def __init__(self, x, y):
-        self.p = [x, y]
-        self.v = [0.0, 0.0]
+    def __init__(self, x, y, arrays=None, index=0):
+        if arrays is None:
+            arrays = tuple(array("d", [value]) for value in (x, y, 0.0, 0.0, x, y))
+        self.arrays = arrays  # (px, py, vx, vy, ox, oy) of the BallSet it lives in
+        self.index = index
         self.r = BALL_RADIUS
         self.alive = True
+        self._p = BallVec(self, 0)
+        self._v = BallVec(self, 2)
 
-    def update(self, dt):
-        self.v[1] += GRAVITY * dt
-        self.p[0] += self.v[0]*dt
-        self.p[1] += self.v[1]*dt
-        self.v[0] *= AIR_FRICTION
-        self.v[1] *= AIR_FRICTION
+    @property
+    def p(self):
+        return self._p
+
+    @p.setter
+    def p(self, value):
+        self._p[0], self._p[1] = value[0], value[1]
+
+    @property
+    def prev(self):
+        # Where the ball was before the last integration step
+        return (self.arrays[4][self.index], self.arrays[5][self.index])
+
+    @property
+    def v(self):
+        return self._v
+
+    @v.setter
+    def v(self, value):
+        self._v[0], self._v[1] = value[0], value[1]
+
+    def detach(self):
+        # Keep the ball's last state in arrays of its own (when it leaves its BallSet)
+        self.arrays = tuple(array("d", [arr[self.index]]) for arr in self.arrays)
+        self.index = 0
 
     def draw(self, surf):
-        draw_silver_ball(surf, self.p, self.r)
+        return draw_silver_ball(surf, self.p, self.r)
+
+class BallSet:
+    # Every ball on the table. Positions and velocities are parallel arrays,
+    # so integration, containment and ball-ball tests are single loops over
+    # plain floats; the Ball views in self.balls keep per-ball code working.
+    def __init__(self):
+        self.px = array("d")
+        self.py = array("d")
+        self.vx = array("d")
+        self.vy = array("d")
+        self.ox = array("d")  # positions before the last integrate (for swept tests)
+        self.oy = array("d")
+        self.arrays = (self.px, self.py, self.vx, self.vy, self.ox, self.oy)
+        self.balls = []
+        self.r = BALL_RADIUS
+        self.pair_tests = 0  # ball-ball distance checks in the last collide_pairs
+
+    def __len__(self):
+        return len(self.balls)
+
+    def __iter__(self):
+        return iter(self.balls)
+
+    def add(self, x, y, vx=0.0, vy=0.0):
+        for arr, value in zip(self.arrays, (x, y, vx, vy, x, y)):
+            arr.append(value)
+        ball = Ball(x, y, self.arrays, len(self.balls))
+        self.balls.append(ball)
+        return ball
+
+    def remove(self, ball):
+        # Swap the last ball into the hole so the arrays stay packed
+        i = ball.index
+        last = len(self.balls) - 1
+        ball.detach()
+        if i != last:
+            moved = self.balls[last]
+            for arr in self.arrays:
+                arr[i] = arr[last]
+            self.balls[i] = moved
+            moved.index = i
+        for arr in self.arrays:
+            arr.pop()
+        self.balls.pop()
+
+    def clear(self):
+        for ball in self.balls:
+            ball.detach()
+        for arr in self.arrays:
+            del arr[:]
+        self.balls = []
+
+    def integrate(self, dt):
+        # Gravity, motion and air friction for every ball at once. Friction is per
+        # tick, so a substep (dt < DT) gets the matching fraction of it.
+        px, py, vx, vy, ox, oy = self.arrays
+        g = GRAVITY * dt
+        friction = AIR_FRICTION if dt == DT else AIR_FRICTION ** (dt / DT)
+        top2 = MAX_BALL_SPEED * MAX_BALL_SPEED
+        for i in range(len(px)):
+            v_y = vy[i] + g
+            v_x = vx[i]
+            s2 = v_x*v_x + v_y*v_y
+            if s2 > top2:
+                scale = MAX_BALL_SPEED / math.sqrt(s2)
+                v_x *= scale
+                v_y *= scale
+            ox[i] = px[i]
+            oy[i] = py[i]
+            px[i] += v_x*dt
+            py[i] += v_y*dt
+            vx[i] = v_x * friction
+            vy[i] = v_y * friction
+
+    def max_speed(self):
+        vx, vy = self.vx, self.vy
+        fastest = 0.0
+        for i in range(len(vx)):
+            s2 = vx[i]*vx[i] + vy[i]*vy[i]
+            if s2 > fastest:
+                fastest = s2
+        return math.sqrt(fastest)
+
+    def contain(self, left, right, top):
+        # Prevent escape off top/left/right
+        px, py, vx, vy = self.arrays[:4]
+        for i in range(len(px)):
+            if px[i] < left:
+                px[i] = left
+                vx[i] = abs(vx[i]) * 0.8
+            if px[i] > right:
+                px[i] = right
+                vx[i] = -abs(vx[i]) * 0.8
+            if py[i] < top:
+                py[i] = top
+                vy[i] = abs(vy[i]) * 0.8
+
+    def collide_pairs(self, restitution=BALL_RESTITUTION):
+        # Sort and sweep on x: only balls whose x ranges overlap get a distance check
+        px, py, vx, vy = self.arrays[:4]
+        n = len(px)
+        self.pair_tests = 0
+        if n < 2:
+            return
+        d2 = 2 * self.r
+        order = sorted(range(n), key=px.__getitem__)
+        for a in range(n):
+            i = order[a]
+            for b in range(a + 1, n):
+                j = order[b]
+                dx = px[j] - px[i]
+                if dx >= d2:
+                    break  # sorted: every later ball is even farther right
+                self.pair_tests += 1
+                dy = py[j] - py[i]
+                dist2 = dx*dx + dy*dy
+                if dist2 >= d2*d2:
+                    continue
+                dist = math.sqrt(dist2)
+                if dist > 1e-6:
+                    nx, ny = dx/dist, dy/dist
+                else:
+                    nx, ny = 0.0, -1.0
+                # Push apart evenly, then exchange the normal impulse (equal masses)
+                push = (d2 - dist) * 0.5 + 0.25
+                px[i] -= nx*push
+                py[i] -= ny*push
+                px[j] += nx*push
+                py[j] += ny*push
+                vn = (vx[j] - vx[i])*nx + (vy[j] - vy[i])*ny
+                if vn < 0.0:
+                    impulse = -(1 + restitution) * vn * 0.5
+                    vx[i] -= nx*impulse
+                    vy[i] -= ny*impulse
+                    vx[j] += nx*impulse
+                    vy[j] += ny*impulse
 
 # -------------------------------
-# Game/Table
+# Broadphase
 # -------------------------------
-class Game:
+BROADPHASE_CELL = 64
+BROADPHASE_MARGIN = 32  # extra reach so pushes from earlier collisions in a tick stay covered
+
+class BroadphaseCell:
+    __slots__ = ("bumpers", "slings", "targets", "walls", "oneways", "flippers", "rollovers")
+
     def __init__(self):
-        self.reset_table()
-        self.new_game()
+        for kind in self.__slots__:
+            setattr(self, kind, [])
+
+class BroadphaseGrid:
+    # Static uniform grid over the table. Each cell lists (in table order) the
+    # colliders whose bounds, grown by the ball radius and a margin, touch it,
+    # so a ball only needs the colliders of the cell its center is in.
+    def __init__(self, width, height, cell=BROADPHASE_CELL, pad=BALL_RADIUS + BROADPHASE_MARGIN):
+        self.cell = cell
+        self.pad = pad
+        self.cols = width // cell + 1
+        self.rows = height // cell + 1
+        self.cells = [BroadphaseCell() for _ in range(self.cols * self.rows)]
+        self.outside = BroadphaseCell()  # ball off the table: nothing to hit
+
+    def insert(self, kind, obj):
+        x0, y0, x1, y1 = obj.bounds()
+        c0 = clamp(int((x0 - self.pad) // self.cell), 0, self.cols - 1)
+        c1 = clamp(int((x1 + self.pad) // self.cell), 0, self.cols - 1)
+        r0 = clamp(int((y0 - self.pad) // self.cell), 0, self.rows - 1)
+        r1 = clamp(int((y1 + self.pad) // self.cell), 0, self.rows - 1)
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                getattr(self.cells[row * self.cols + col], kind).append(obj)
+
+    def query(self, x, y):
+        col = int(x // self.cell)
+        row = int(y // self.cell)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.cells[row * self.cols + col]
+        return self.outside
 
-    def reset_table(self):
+# -------------------------------
+# Tables
+# -------------------------------
+TABLE_FORMAT = 1  # version of the table file format
+ROLLOVER_SCORES = {"top": TOP_LANE_SCORE, "inlane": INLANE_SCORE, "outlane": OUTLANE_PENALTY}
+
+def classic_table():
+    # The built-in table, in table file form (--export-table FILE writes it out).
+    # Points are [x, y]; walls, gates and targets are [x1, y1, x2, y2].
+    margin = 20
+    y = H - 250
+    tx = margin + 250
+    fy = H - 140
+    return {
+        "format": TABLE_FORMAT,
+        "name": "Classic",
+        # Closed and counter-clockwise so left-hand normals face inward, with
+        # angled top corners. Its bottom edge leaves the drain gap open. On the
+        # right it runs round the shooter lane (giving it a floor) and roofs
+        # the lane top at 45 degrees, turning a launched ball into the playfield.
+        "playfield": [
+            [margin+40, 170], [W-160, 100], [W-margin-70, 80], [W-margin-20, 130],
+            [W-margin-20, H-240], [W-margin-70, H-240], [W-150, H-40],
+            [margin+150, H-40], [margin+100, H-260],
+            [margin+100, 180],
+        ],
+        # Drain line (bottom arch) with an opening between the flippers
+        "drain": {"y": H - margin - 10, "gap": [margin+190, W - margin - 190], "line": [margin+110, W - margin - 110]},
+        # Shooter lane (right)
+        "lane": {"left": W - margin - 70, "right": W - margin - 20, "top": 150, "bottom": H - 240},
+        # One-way gate across the lane exit: its left-hand normal points into
+        # the playfield, so it only blocks a ball coming back into the lane
+        "gates": [[W - margin - 70, 80, W - margin - 70, 150]],
+        # Channel walls shaping inlanes/outlanes (left guides, then right)
+        "walls": [
+            [margin+120, H-300, margin+85, H-170],
+            [margin+200, H-300, margin+165, H-170],
+            [W-margin-120, H-300, W-margin-85, H-170],
+            [W-margin-200, H-300, W-margin-165, H-170],
+        ],
+        # Slingshots (above flippers): three corners each
+        "slings": [
+            [margin+190, y+60, margin+300, y+20, margin+260, y+90],
+            [W-margin-190, y+60, W-margin-300, y+20, W-margin-260, y+90],
+        ],
+        # Bumper cluster (triangle mid-top) + side bumpers: [x, y, r]
+        "bumpers": [
+            [W*0.36, H*0.34, 34], [W*0.64, H*0.32, 34], [W*0.50, H*0.44, 34],
+            [W*0.26, H*0.52, 30], [W*0.74, H*0.52, 30],
+        ],
+        # [x, y, r, kind, label]: 3 top lanes, then inlanes and outlanes
+        "rollovers": [
+            [W*0.30, 180, 20, "top", "P"], [W*0.50, 150, 20, "top", "B"], [W*0.70, 180, 20, "top", "P"],
+            [margin+170, H-200, 22, "inlane", None], [W-margin-170, H-200, 22, "inlane", None],
+            [margin+100, H-200, 22, "outlane", None], [W-margin-100, H-200, 22, "outlane", None],
+        ],
+        # Stand-up targets (left bank of 3)
+        "targets": [[tx, 480, tx, 520], [tx+26, 470, tx+26, 510], [tx+52, 460, tx+52, 500]],
+        # [pivot x, pivot y, length, rest angle, swing] (degrees; a positive
+        # swing turns the tip anticlockwise on screen)
+        "flippers": {"left": [W*0.33, fy, 140, 200, -40], "right": [W*0.67, fy, 140, -20, 40]},
+        "plunger": {"max": 1900.0, "charge_rate": 1700.0},
+    }
+
+class Table:
+    # Every collider and sensor of one table, built from a table dict, with
+    # its broadphase. Building does all the geometry preprocessing up front.
+    PARTS = ("walls", "oneways", "slings", "bumpers", "rollovers", "rollovers_top", "targets",
+             "left_flipper", "right_flipper", "broadphase", "playfield_poly",
+             "drain_y", "drain_left", "drain_right",
+             "lane_x_left", "lane_x_right", "lane_top", "lane_bottom",
+             "PLUNGER_MAX", "PLUNGER_CHARGE_RATE")
+
+    def __init__(self, data):
+        if data.get("format") != TABLE_FORMAT:
+            raise ValueError(f"unsupported table format {data.get('format')}")
+        self.name = data.get("name", "Table")
+        # Identifies the layout (whatever file it came from), for replays
+        self.digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
         self.walls = []
         self.oneways = []
         self.slings = []
@@ -418,104 +1138,138 @@ class Game:
         self.rollovers = []
         self.targets = []
 
-        margin = 20
-
-        # Playfield polygon (closed) with angled top corners
-        # (Counter-clockwise so left-hand normals face inward)
-        self.playfield_poly = [
-            (margin+40, 170), (W-140, 120), (W-100, 180),  # angled right-top
-            (W-100, H-260), (W-150, H-40),
-            (margin+150, H-40), (margin+100, H-260),
-            (margin+100, 180)
-        ]
+        self.playfield_poly = [tuple(p) for p in data["playfield"]]
+        drain = data["drain"]
+        self.drain_y = drain["y"]
+        self.drain_left = (drain["gap"][0], self.drain_y)
+        self.drain_right = (drain["gap"][1], self.drain_y)
+        bottom = max(p[1] for p in self.playfield_poly)
         for i in range(len(self.playfield_poly)):
             a = self.playfield_poly[i]
             b = self.playfield_poly[(i+1) % len(self.playfield_poly)]
-            self.walls.append(Wall(a, b))
-
-        # Shooter lane (right)
-        self.lane_x_right = W - margin - 20
-        self.lane_x_left = W - margin - 70
-        top_lane_y = 150
-        bottom_lane_y = H - 240
-        self.walls.append(Wall((self.lane_x_left, top_lane_y), (self.lane_x_left, bottom_lane_y)))
-        self.walls.append(Wall((self.lane_x_right, top_lane_y), (self.lane_x_right, bottom_lane_y)))
-
-        # One-way gate at top of shooter lane (diagonal toward playfield)
-        gate_y = 210
-        gate_a = (self.lane_x_left, gate_y)
-        gate_b = (self.lane_x_right, gate_y - 30)
-        # Normal should block motion from playfield into lane (i.e., pointing into playfield)
-        # With left-hand normal of (a->b), we choose direction so normal faces +x (approx).
-        self.oneways.append(OneWayWall(gate_b, gate_a, restitution=1.0))
-
-        # Drain line (bottom arch)
-        self.drain_y = H - margin - 10
-        self.drain_left = (margin+190, self.drain_y)
-        self.drain_right = (W - margin - 190, self.drain_y)
-        self.walls.append(Wall((margin+110, self.drain_y), (W - margin - 110, self.drain_y)))
-
-        # Slingshots (above flippers)
-        y = H - 250
-        self.slings.append(SlingShot((margin+190, y+60), (margin+300, y+20), (margin+260, y+90)))
-        self.slings.append(SlingShot((W-margin-190, y+60), (W-margin-300, y+20), (W-margin-260, y+90)))
-
-        # Bumper cluster (triangle mid-top) + side bumpers
-        self.bumpers.append(CircleBumper((W*0.36, H*0.34)))
-        self.bumpers.append(CircleBumper((W*0.64, H*0.32)))
-        self.bumpers.append(CircleBumper((W*0.50, H*0.44)))
-        self.bumpers.append(CircleBumper((W*0.26, H*0.52), r=30))
-        self.bumpers.append(CircleBumper((W*0.74, H*0.52), r=30))
-
-        # Top rollovers (3 lanes)
-        self.rollovers_top = [
-            Rollover((W*0.30, 180), r=20, score=TOP_LANE_SCORE, label="P"),
-            Rollover((W*0.50, 150), r=20, score=TOP_LANE_SCORE, label="B"),
-            Rollover((W*0.70, 180), r=20, score=TOP_LANE_SCORE, label="P"),
-        ]
-        self.rollovers.extend(self.rollovers_top)
-
-        # Inlanes / Outlanes (sensors + wall channels)
-        # Left side
-        self.inlane_left = Rollover((margin+170, H-200), r=22, score=INLANE_SCORE, label=None)
-        self.outlane_left = Rollover((margin+100, H-200), r=22, score=OUTLANE_PENALTY, label=None)
-        # Right side
-        self.inlane_right = Rollover((W-margin-170, H-200), r=22, score=INLANE_SCORE, label=None)
-        self.outlane_right = Rollover((W-margin-100, H-200), r=22, score=OUTLANE_PENALTY, label=None)
-        self.rollovers += [self.inlane_left, self.inlane_right, self.outlane_left, self.outlane_right]
-
-        # Channel walls shaping inlanes/outlanes (simple line guides)
-        # Left guides
-        self.walls.append(Wall((margin+120, H-300), (margin+85, H-170)))
-        self.walls.append(Wall((margin+200, H-300), (margin+165, H-170)))
-        # Right guides
-        self.walls.append(Wall((W-margin-120, H-300), (W-margin-85, H-170)))
-        self.walls.append(Wall((W-margin-200, H-300), (W-margin-165, H-170)))
+            if a[1] == b[1] == bottom:
+                # Bottom edge (right to left): leave the drain gap open
+                self.walls.append(Wall(a, (self.drain_right[0], a[1])))
+                self.walls.append(Wall((self.drain_left[0], b[1]), b))
+            else:
+                self.walls.append(Wall(a, b))
+
+        lane = data["lane"]
+        self.lane_x_left, self.lane_x_right = lane["left"], lane["right"]
+        self.lane_top, self.lane_bottom = lane["top"], lane["bottom"]
+        self.walls.append(Wall((self.lane_x_left, self.lane_top), (self.lane_x_left, self.lane_bottom)))
+        self.walls.append(Wall((self.lane_x_right, self.lane_top), (self.lane_x_right, self.lane_bottom)))
+
+        for x1, y1, x2, y2 in data.get("gates", []):
+            self.oneways.append(OneWayWall((x1, y1), (x2, y2), restitution=1.0))
+
+        self.walls.append(Wall((drain["line"][0], self.drain_y), self.drain_left))
+        self.walls.append(Wall(self.drain_right, (drain["line"][1], self.drain_y)))
+
+        for x1, y1, x2, y2, x3, y3 in data.get("slings", []):
+            self.slings.append(SlingShot((x1, y1), (x2, y2), (x3, y3)))
+        for x, y, r in data.get("bumpers", []):
+            self.bumpers.append(CircleBumper((x, y), r=r))
+        self.rollovers_top = []
+        for x, y, r, kind, label in data.get("rollovers", []):
+            rollover = Rollover((x, y), r=r, score=ROLLOVER_SCORES[kind], label=label)
+            self.rollovers.append(rollover)
+            if kind == "top":
+                self.rollovers_top.append(rollover)
+        for x1, y1, x2, y2 in data.get("walls", []):
+            self.walls.append(Wall((x1, y1), (x2, y2)))
+        for x1, y1, x2, y2 in data.get("targets", []):
+            self.targets.append(StandupTarget((x1, y1), (x2, y2)))
+
+        flippers = data["flippers"]
+        px, py, length, base, swing = flippers["left"]
+        self.left_flipper = Flipper((px, py), length, base, swing, 'L')
+        px, py, length, base, swing = flippers["right"]
+        self.right_flipper = Flipper((px, py), length, base, swing, 'R')
+
+        self.PLUNGER_MAX = float(data["plunger"]["max"])
+        self.PLUNGER_CHARGE_RATE = float(data["plunger"]["charge_rate"])
+
+        self.build_broadphase()
+
+    def build_broadphase(self):
+        self.broadphase = BroadphaseGrid(W, H)
+        for kind, objs in (("bumpers", self.bumpers), ("slings", self.slings), ("targets", self.targets),
+                           ("walls", self.walls), ("oneways", self.oneways),
+                           ("flippers", [self.left_flipper, self.right_flipper]), ("rollovers", self.rollovers)):
+            for obj in objs:
+                self.broadphase.insert(kind, obj)
+
+def load_table(path):
+    # Table from a table file. Building one takes well under a millisecond,
+    # less than reading a cache back did, so nothing is cached.
+    with open(path, "r", encoding="utf-8") as f:
+        return Table(json.load(f))
 
-        # Stand-up targets (left bank of 3)
-        tx = margin + 250
-        self.targets.append(StandupTarget((tx, 480), (tx, 520)))
-        self.targets.append(StandupTarget((tx+26, 470), (tx+26, 510)))
-        self.targets.append(StandupTarget((tx+52, 460), (tx+52, 500)))
+# -------------------------------
+# Game/Table
+# -------------------------------
+class Game:
+    def __init__(self, table=None):
+        self.show_debug = False  # F3: physics counters in the HUD
+        self.narrow_tests = 0  # narrow-phase collider tests in the last tick
+        self.substeps = 1  # physics substeps in the last tick
+        self.balls = BallSet()
+        self.reset_table(table)
+        self.new_game()
 
-        # Flippers (pivot from inside corners, angled slightly upward toward center)
-        fy = H - 140
-        self.left_flipper  = Flipper((W*0.33, fy), 140, 200, 40, 'L')
-        self.right_flipper = Flipper((W*0.67, fy), 140, -20, 40, 'R')
+    def reset_table(self, table=None):
+        # Put a table in play: the given one, else --table FILE or the built-in one
+        if table is None:
+            table = load_table(TABLE_PATH) if TABLE_PATH else Table(classic_table())
+        self.table = table
+        for name in Table.PARTS:
+            setattr(self, name, getattr(table, name))
 
         # Plunger
         self.plunger = 0.0
         self.plunger_charging = False
-        self.PLUNGER_MAX = 950.0
-        self.PLUNGER_CHARGE_RATE = 1700.0
 
-    def new_game(self):
+        # Scoring pieces by name, for hit counts
+        self.piece_names = {}
+        for kind, pieces in (("bumper", self.bumpers), ("sling", self.slings),
+                             ("target", self.targets), ("rollover", self.rollovers)):
+            for n, piece in enumerate(pieces, 1):
+                label = getattr(piece, "label", None)
+                self.piece_names[piece] = f"{kind} {n}" + (f" {label}" if label else "")
+
+        self.build_static_layer()
+
+    def new_game(self, start_balls=None):
+        start_balls = START_BALLS if start_balls is None else start_balls
         self.score = 0
         self.mult = 1
         self.balls_left = BALLS_PER_GAME
         self.extra_awarded = False
+        self.tick = 0  # physics ticks run this game
+        self.replay = Replay(start_balls, table=self.table.digest)  # inputs so far, for --record
+        self.hits = {}  # scoring piece -> times hit this game
+        self.drains = []  # x where each ball left the table this game
+        self.left_flipper.reset()
+        self.right_flipper.reset()
         self.reset_rollovers()
         self.spawn_ball()
+        if start_balls > 1:
+            self.add_multiball(start_balls - 1)
+
+    def press(self, control, down):
+        # All play input goes through here (and is recorded with its tick):
+        # control is "left", "right" or "plunger"
+        self.replay.record(self.tick, control, down)
+        if control == "left":
+            self.left_flipper.keydown = down
+        elif control == "right":
+            self.right_flipper.keydown = down
+        elif control == "plunger" and self.in_shooter:
+            if down:
+                self.plunger_charging = True
+            else:
+                self.launch()
 
     def reset_rollovers(self):
         for r in self.rollovers:
@@ -523,12 +1277,30 @@ class Game:
 
     def spawn_ball(self):
         # Spawn ball in shooter lane
-        self.ball = Ball(self.lane_x_left + 25, H - 260)
-        self.ball.v = [0.0, 0.0]
+        self.balls.clear()
+        self.ball = self.balls.add(self.lane_x_left + 25, self.lane_bottom - 20)
         self.in_shooter = True
         self.plunger = 0.0
         self.plunger_charging = False
 
+    def add_multiball(self, count):
+        # Drop extra balls into the playfield from across the top lanes
+        for i in range(count):
+            x = W*0.28 + (W*0.44) * ((i % 8) + 0.5) / 8
+            y = 250 + 40 * (i // 8)
+            self.balls.add(x, y, 120.0 if i % 2 else -120.0, 0.0)
+
+    def drain(self, ball):
+        # One ball of several: just take it off the table. The last one costs a ball.
+        self.drains.append(ball.p[0])
+        if len(self.balls) > 1:
+            self.balls.remove(ball)
+            if ball is self.ball:
+                self.ball = self.balls.balls[0]  # keep a ball in play as the main one
+                self.in_shooter = False
+        else:
+            self.lose_ball()
+
     def lose_ball(self):
         self.balls_left -= 1
         if self.balls_left >= 1:
@@ -537,6 +1309,11 @@ class Game:
             # Signal game over handled by outer state
             pass
 
+    def hit(self, piece):
+        # A scoring piece was hit by a ball
+        self.hits[piece] = self.hits.get(piece, 0) + 1
+        self.add_score(piece.score)
+
     def add_score(self, points):
         self.score += points * self.mult
         # Extra ball threshold
@@ -545,46 +1322,48 @@ class Game:
             self.extra_awarded = True
 
     # Collisions ----------------------------------------------------
-    def collide_walls(self, ball):
-        for w in self.walls:
-            w.collide(ball)
-        for ow in self.oneways:
-            ow.collide(ball)
-
-    def collide_flippers(self, ball):
-        self.left_flipper.collide(ball)
-        self.right_flipper.collide(ball)
-
-    def collide_slings(self, ball):
-        for s in self.slings:
-            s.collide(self, ball)
-
-    def collide_bumpers(self, ball):
-        for b in self.bumpers:
+    # Each takes the broadphase cell the ball is in and only tests what it lists.
+    def collide_walls(self, ball, cell):
+        for w in cell.walls:
+            w.collide(ball, True)
+        for ow in cell.oneways:
+            ow.collide(ball, True)
+        self.narrow_tests += len(cell.walls) + len(cell.oneways)
+
+    def collide_flippers(self, ball, cell, start, end):
+        # start/end: the part of this tick's flipper swing the substep covers
+        for f in cell.flippers:
+            f.collide(ball, start, end)
+        self.narrow_tests += len(cell.flippers)
+
+    def collide_slings(self, ball, cell):
+        for s in cell.slings:
+            s.collide(self, ball, True)
+        self.narrow_tests += len(cell.slings)
+
+    def collide_bumpers(self, ball, cell):
+        for b in cell.bumpers:
             b.collide(self, ball)
+        self.narrow_tests += len(cell.bumpers)
 
-    def collide_targets(self, ball):
-        for t in self.targets:
-            t.collide(self, ball)
+    def collide_targets(self, ball, cell):
+        for t in cell.targets:
+            t.collide(self, ball, True)
+        self.narrow_tests += len(cell.targets)
 
-    def sense_rollovers(self, ball):
-        # Top lanes
-        all_active = True
-        for r in self.rollovers_top:
+    def sense_rollovers(self, ball, cell):
+        # Top lanes, inlanes and outlanes near the ball
+        for r in cell.rollovers:
             r.sense(self, ball)
-            if not r.active:
-                all_active = False
-        if all_active:
-            # Award once per completion; then reset top lanes
+        self.narrow_tests += len(cell.rollovers)
+
+        if all(r.active for r in self.rollovers_top):
+            # Award once per completion; then reset top lanes and start multiball (unless running)
             self.add_score(ROLL_OVER_BONUS)
             for r in self.rollovers_top:
                 r.active = False
-
-        # Inlanes/outlanes
-        self.inlane_left.sense(self, ball)
-        self.inlane_right.sense(self, ball)
-        self.outlane_left.sense(self, ball)
-        self.outlane_right.sense(self, ball)
+            if len(self.balls) == 1:
+                self.add_multiball(MULTIBALL_EXTRA)
 
     # Update & Draw -------------------------------------------------
     def update(self, dt, inputs_locked=False):
@@ -596,38 +1375,46 @@ class Game:
             # e.g., pause
             return
 
+        # A launch too weak to clear the gate falls back onto the plunger
+        if (not self.in_shooter and self.ball.v[1] >= 0.0 and self.ball.p[0] > self.lane_x_left
+                and self.ball.p[1] > self.lane_bottom - 2*BALL_RADIUS):
+            self.in_shooter = True
+
         # Plunger hold influences only while in shooter lane
-        if self.in_shooter and self.plunger_charging:
-            self.plunger = clamp(self.plunger + self.PLUNGER_CHARGE_RATE*dt, 0.0, self.PLUNGER_MAX)
+        if self.in_shooter:
+            if self.plunger_charging:
+                self.plunger = clamp(self.plunger + self.PLUNGER_CHARGE_RATE*dt, 0.0, self.PLUNGER_MAX)
             # Pin ball at bottom of shooter lane
             self.ball.p[0] = clamp(self.ball.p[0], self.lane_x_left + BALL_RADIUS + 8, self.lane_x_right - BALL_RADIUS - 8)
-            self.ball.p[1] = H - 240 - BALL_RADIUS - 1
-
-        # Update ball physics
-        self.ball.update(dt)
-
-        # Apply collisions/sensors
-        self.collide_bumpers(self.ball)
-        self.collide_slings(self.ball)
-        self.collide_targets(self.ball)
-        self.collide_walls(self.ball)
-        self.collide_flippers(self.ball)
-        self.sense_rollovers(self.ball)
-
-        # Prevent escape off top/left/right
-        if self.ball.p[0] < BALL_RADIUS + 4:
-            self.ball.p[0] = BALL_RADIUS + 4
-            self.ball.v[0] = abs(self.ball.v[0]) * 0.8
-        if self.ball.p[0] > W - BALL_RADIUS - 4:
-            self.ball.p[0] = W - BALL_RADIUS - 4
-            self.ball.v[0] = -abs(self.ball.v[0]) * 0.8
-        if self.ball.p[1] < BALL_RADIUS + 4:
-            self.ball.p[1] = BALL_RADIUS + 4
-            self.ball.v[1] = abs(self.ball.v[1]) * 0.8
+            self.ball.p[1] = self.lane_bottom - BALL_RADIUS - 1
+            self.ball.v = [0.0, 0.0]
+
+        # Substep so the fastest ball moves at most SUBSTEP_TRAVEL per step
+        self.substeps = clamp(math.ceil(self.balls.max_speed() * dt / SUBSTEP_TRAVEL), 1, MAX_SUBSTEPS)
+        step_dt = dt / self.substeps
+        self.narrow_tests = 0
+        for step in range(self.substeps):
+            # Update ball physics (every ball in one pass over the arrays)
+            self.balls.integrate(step_dt)
+
+            # Apply collisions/sensors (only the colliders near each ball)
+            for ball in list(self.balls):  # a completed top lane can add balls mid-loop
+                cell = self.broadphase.query(ball.p[0], ball.p[1])
+                self.collide_bumpers(ball, cell)
+                self.collide_slings(ball, cell)
+                self.collide_targets(ball, cell)
+                self.collide_walls(ball, cell)
+                self.collide_flippers(ball, cell, step / self.substeps, (step + 1) / self.substeps)
+                self.sense_rollovers(ball, cell)
+            self.balls.collide_pairs()
+
+            # Prevent escape off top/left/right
+            self.balls.contain(BALL_RADIUS + 4, W - BALL_RADIUS - 4, BALL_RADIUS + 4)
 
         # Drain detection
-        if self.ball.p[1] > self.drain_y + 30:
-            self.lose_ball()
+        for ball in list(self.balls):
+            if ball.p[1] > self.drain_y + 30:
+                self.drain(ball)
 
         # Decay flashes
         for s in self.slings:
@@ -639,6 +1426,8 @@ class Game:
         for t in self.targets:
             if t.flash > 0: t.flash -= dt
 
+        self.tick += 1
+
     def launch(self):
         # Convert plunger to vertical launch velocity
         power = clamp(self.plunger, 0.0, self.PLUNGER_MAX)
@@ -648,53 +1437,103 @@ class Game:
         self.plunger_charging = False
         self.plunger = 0.0
 
-    def draw(self, surf, show_hud=True):
-        # Background
-        surf.fill(BG)
+    def build_static_layer(self):
+        # Everything that never changes during play, drawn once per table
+        layer = pygame.Surface((W, H)).convert()
+        layer.fill(BG)
 
         # Subtle horizontal stripes
         for i in range(0, H, 42):
             a = 30 + (i//42)%2*10
-            pygame.draw.line(surf, (a, a, a), (28, i), (W-28, i), 1)
+            pygame.draw.line(layer, (a, a, a), (28, i), (W-28, i), 1)
+
+        # Playfield polygon (the lane and walls go on top)
+        pygame.draw.polygon(layer, (26, 28, 33), self.playfield_poly, 0)
 
         # Shooter lane area
-        pygame.draw.rect(surf, (28, 30, 36), (self.lane_x_left, 150, self.lane_x_right - self.lane_x_left, H - 370))
-        pygame.draw.line(surf, GREY, (self.lane_x_left, 150), (self.lane_x_left, H - 220), 3)
-        pygame.draw.line(surf, GREY, (self.lane_x_right, 150), (self.lane_x_right, H - 220), 3)
+        lane_end = self.lane_bottom + 20
+        pygame.draw.rect(layer, (28, 30, 36), (self.lane_x_left, self.lane_top, self.lane_x_right - self.lane_x_left, lane_end - self.lane_top))
+        pygame.draw.line(layer, GREY, (self.lane_x_left, self.lane_top), (self.lane_x_left, lane_end), 3)
+        pygame.draw.line(layer, GREY, (self.lane_x_right, self.lane_top), (self.lane_x_right, lane_end), 3)
 
         # Gate
         for ow in self.oneways:
-            ow.draw(surf, color=(160, 220, 160), width=4)
+            ow.draw(layer, color=(160, 220, 160), width=4)
 
-        # Playfield polygon
-        pygame.draw.polygon(surf, (26, 28, 33), self.playfield_poly, 0)
         for w in self.walls:
-            w.draw(surf)
+            w.draw(layer)
+
+        # Bottom arch
+        pygame.draw.line(layer, GREY, (28, self.drain_y), (W-28, self.drain_y), 2)
 
-        # Slings, bumpers, targets
-        for s in self.slings: s.draw(surf)
-        for b in self.bumpers: b.draw(surf)
-        for t in self.targets: t.draw(surf)
-        for r in self.rollovers: r.draw(surf)
+        self.static_layer = layer
+        self.pieces = self.slings + self.bumpers + self.targets + self.rollovers
+        self.piece_rects = {}  # piece -> screen Rect it covers
+        self.piece_lit = {}  # piece -> lit() when it was last drawn
+        self.drawn_rects = []  # moving things and HUD drawn last frame
+        self.full_redraw = True
 
-        # Flippers
-        self.left_flipper.draw(surf, color=WHITE)
-        self.right_flipper.draw(surf, color=WHITE)
+    def draw(self, surf, show_hud=True):
+        surf.blit(self.static_layer, (0, 0))
 
-        # Ball
-        self.ball.draw(surf)
+        # Slings, bumpers, targets, rollovers
+        for piece in self.pieces:
+            self.piece_rects[piece] = piece.draw(surf)
+            self.piece_lit[piece] = piece.lit()
 
-        # Bottom arch
-        pygame.draw.line(surf, GREY, (28, self.drain_y), (W-28, self.drain_y), 2)
+        self.drawn_rects = self.draw_moving(surf, show_hud)
 
+    def draw_moving(self, surf, show_hud):
+        # Flippers, balls and HUD (on top); returns the rects they cover
+        rects = [self.left_flipper.draw(surf, color=WHITE),
+                 self.right_flipper.draw(surf, color=WHITE)]
+        for ball in self.balls:
+            rects.append(ball.draw(surf))
         if show_hud:
-            self.draw_hud(surf)
+            rects.extend(self.draw_hud(surf))
+        return rects
+
+    def draw_dirty(self, surf, show_hud=True):
+        # Redraw only what moved or changed since the last frame and return
+        # those rects for pygame.display.update
+        if self.full_redraw:
+            self.full_redraw = False
+            self.draw(surf, show_hud)
+            return [surf.get_rect()]
+
+        # Erase last frame's moving things and pieces that lit up or went dark.
+        # A piece touching an erased area is erased and repainted whole (its
+        # anti-aliased edges can't be drawn twice), which can take in more pieces.
+        dirty = self.drawn_rects
+        for piece in self.pieces:
+            if piece.lit() != self.piece_lit[piece]:
+                dirty.append(self.piece_rects[piece])
+        repaint = []
+        grown = True
+        while grown:
+            grown = False
+            for piece in self.pieces:
+                if piece not in repaint and self.piece_rects[piece].collidelist(dirty) != -1:
+                    repaint.append(piece)
+                    dirty.append(self.piece_rects[piece])
+                    grown = True
+        for rect in dirty:
+            surf.blit(self.static_layer, rect, rect)
+
+        for piece in self.pieces:
+            if piece in repaint:
+                piece.draw(surf)
+                self.piece_lit[piece] = piece.lit()
+
+        self.drawn_rects = self.draw_moving(surf, show_hud)
+        return dirty + self.drawn_rects
 
     def draw_hud(self, surf):
+        # Returns the rects drawn over (for dirty-rect updates)
         # HUD bar
         hud_h = 78
-        pygame.draw.rect(surf, (14, 14, 18), (0, 0, W, hud_h))
-        pygame.draw.line(surf, (50, 50, 60), (0, hud_h), (W, hud_h), 2)
+        rects = [pygame.draw.rect(surf, (14, 14, 18), (0, 0, W, hud_h)),
+                 pygame.draw.line(surf, (50, 50, 60), (0, hud_h), (W, hud_h), 2)]
 
         s1 = UI_FONT_HUGE.render(f"{self.score:,}", True, WHITE)
         surf.blit(s1, (24, 8))
@@ -703,16 +1542,25 @@ class Game:
         s3 = UI_FONT.render(f"v{VERSION}", True, GREY)
         surf.blit(s3, (W - 110, 52))
 
+        if self.show_debug:
+            s4 = UI_FONT.render(f"narrow tests/tick: {self.narrow_tests}", True, NEON1)
+            rects.append(surf.blit(s4, (24, hud_h + 10)))
+            s5 = UI_FONT.render(f"balls: {len(self.balls)}  pair tests: {self.balls.pair_tests}", True, NEON1)
+            rects.append(surf.blit(s5, (24, hud_h + 40)))
+            s6 = UI_FONT.render(f"substeps/tick: {self.substeps}", True, NEON1)
+            rects.append(surf.blit(s6, (24, hud_h + 70)))
+
         # Plunger meter (only when in shooter)
         if self.in_shooter:
             meter_w = 12
             meter_h = 240
             x = self.lane_x_right + 24
-            y = H - 240 - meter_h
-            pygame.draw.rect(surf, (40,40,50), (x, y, meter_w, meter_h), 2)
+            y = self.lane_bottom - meter_h
+            rects.append(pygame.draw.rect(surf, (40,40,50), (x, y, meter_w, meter_h), 2))
             pct = clamp(self.plunger / self.PLUNGER_MAX, 0.0, 1.0)
             fill_h = int(pct * (meter_h-4))
             pygame.draw.rect(surf, ACCENT, (x+2, y + (meter_h-2 - fill_h), meter_w-4, fill_h))
+        return rects
 
 # -------------------------------
 # Scenes / App
@@ -732,10 +1580,12 @@ class App:
         self.name_prompt_time = 0.0
         self.flash_timer = 0.0
         self.pending_final_score = 0
+        self.lag = 0.0  # real time not yet simulated (less than one DT)
 
     # --- Scene Helpers ---
     def switch(self, new_scene):
         self.scene = new_scene
+        self.game.full_redraw = True  # other scenes draw over the whole screen
         self.flash_timer = 0.0
         self.name_prompt_time = 0.0
 
@@ -758,12 +1608,14 @@ class App:
         elif self.scene == SCENE_PLAY:
             if key == pygame.K_ESCAPE:
                 self.switch(SCENE_PAUSE)
+            if key == pygame.K_F3:
+                self.game.show_debug = not self.game.show_debug
             if key == pygame.K_LEFT:
-                self.game.left_flipper.keydown = True
+                self.game.press("left", True)
             if key == pygame.K_RIGHT:
-                self.game.right_flipper.keydown = True
-            if key == pygame.K_SPACE and self.game.in_shooter:
-                self.game.plunger_charging = True
+                self.game.press("right", True)
+            if key == pygame.K_SPACE:
+                self.game.press("plunger", True)
 
         elif self.scene == SCENE_PAUSE:
             if key in (pygame.K_UP, pygame.K_LEFT):
@@ -803,11 +1655,11 @@ class App:
     def handle_keyup(self, key):
         if self.scene == SCENE_PLAY:
             if key == pygame.K_LEFT:
-                self.game.left_flipper.keydown = False
+                self.game.press("left", False)
             if key == pygame.K_RIGHT:
-                self.game.right_flipper.keydown = False
-            if key == pygame.K_SPACE and self.game.in_shooter:
-                self.game.launch()
+                self.game.press("right", False)
+            if key == pygame.K_SPACE:
+                self.game.press("plunger", False)
 
     # --- Menu Selectors ---
     def select_menu(self):
@@ -853,6 +1705,8 @@ class App:
             # Detect game over transition
             if self.game.balls_left <= 0 and self.game.ball.p[1] > self.game.drain_y + 30:
                 final_score = self.game.score
+                if RECORD_PATH:
+                    self.game.replay.save(next_record_path(RECORD_PATH), self.game.tick, final_score)
                 if HS.qualifies(final_score):
                     self.pending_final_score = final_score
                     self.name_entry_chars = []
@@ -979,11 +1833,430 @@ class App:
             elif e.type == pygame.KEYUP:
                 self.handle_keyup(e.key)
 
-        self.update(dt)
-        self.draw(screen)
-        pygame.display.flip()
+        if self.scene == SCENE_PLAY:
+            # Physics always steps by DT: run as many ticks as real time allows
+            self.lag = min(self.lag + dt, MAX_FRAME_TIME)
+            while self.lag >= DT and self.scene == SCENE_PLAY:
+                self.update(DT)
+                self.lag -= DT
+        else:
+            self.update(dt)
+
+        if self.scene == SCENE_PLAY:
+            # Only the parts of the table that changed
+            pygame.display.update(self.game.draw_dirty(screen))
+        else:
+            self.draw(screen)
+            pygame.display.flip()
         return True
 
+# -------------------------------
+# Collision benchmark (--bench-collision)
+# -------------------------------
+def reference_wall_collide(wall, ball, prev):
+    # Wall.collide as it was before walls were compiled, on the tuple helpers
+    toi = segment_toi(prev, ball.p, ball.r, wall.a, wall.b)
+    if toi is not None:
+        ball.p[0] = prev[0] + (ball.p[0]-prev[0])*toi
+        ball.p[1] = prev[1] + (ball.p[1]-prev[1])*toi
+    q, t = proj_point_on_segment(ball.p, wall.a, wall.b)
+    d = (ball.p[0]-q[0], ball.p[1]-q[1])
+    dist = vlen(d)
+    if dist < ball.r + 1e-6:
+        n = vnorm(d) if dist > 1e-6 else wall.n
+        push = ball.r - dist + 0.5
+        ball.p[0] += n[0]*push
+        ball.p[1] += n[1]*push
+        if dot(ball.v, n) < 0.0:
+            ball.v = list(reflect(ball.v, n, wall.restitution))
+
+def bench_collision(samples=4000, seed=1, traces=50, trace_ticks=600):
+    # Every table wall against random swept balls, once through the old
+    # helpers and once through collide_segment; prints ns per test. Then
+    # follows `traces` balls for `trace_ticks` ticks each way and prints how
+    # far apart the two end up, since rounding differences can grow.
+    game = Game()
+    walls = game.walls
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(samples):
+        x, y = rng.uniform(100, W - 100), rng.uniform(120, H - 20)
+        vx, vy = rng.uniform(-3000, 3000), rng.uniform(-3000, 3000)
+        cases.append((x, y, vx, vy, x - vx*DT, y - vy*DT))
+    ball = Ball(0.0, 0.0)
+    px, py, bvx, bvy, ox, oy = ball.arrays
+
+    def run(test):
+        results = []
+        start = time.perf_counter()
+        for x, y, vx, vy, x0, y0 in cases:
+            px[0], py[0], bvx[0], bvy[0], ox[0], oy[0] = x, y, vx, vy, x0, y0
+            for w in walls:
+                test(w)
+            results.append((px[0], py[0], bvx[0], bvy[0]))
+        return time.perf_counter() - start, results
+
+    def reference(w):
+        reference_wall_collide(w, ball, ball.prev)
+    def compiled(w):
+        w.collide(ball, True)
+
+    ref_time, ref_results = run(reference)
+    new_time, new_results = run(compiled)
+    tests = samples * len(walls)
+    mismatches = sum(1 for a, b in zip(ref_results, new_results)
+                     if max(abs(p - q) for p, q in zip(a, b)) > 1e-6)
+    print(f"{tests} ball-wall tests ({len(walls)} walls)")
+    print(f"helpers:  {ref_time / tests * 1e9:8.0f} ns/test")
+    print(f"compiled: {new_time / tests * 1e9:8.0f} ns/test ({ref_time / new_time:.1f}x)")
+    print(f"mismatches: {mismatches}")
+
+    balls = BallSet()
+    traced = balls.add(0.0, 0.0)
+    def trace(test, x, y, vx, vy):
+        balls.px[0], balls.py[0], balls.vx[0], balls.vy[0] = x, y, vx, vy
+        for _ in range(trace_ticks):
+            balls.integrate(DT)
+            for w in walls:
+                test(w)
+        return balls.px[0], balls.py[0]
+    drifts = []
+    for x, y, vx, vy, _, _ in cases[:traces]:
+        a = trace(lambda w: reference_wall_collide(w, traced, traced.prev), x, y, vx, vy)
+        b = trace(lambda w: w.collide(traced, True), x, y, vx, vy)
+        drifts.append(math.hypot(a[0] - b[0], a[1] - b[1]))
+    drifts.sort()
+    print(f"{traces} traces of {trace_ticks} ticks: {sum(1 for d in drifts if d == 0.0)} identical, "
+          f"median drift {drifts[len(drifts) // 2]:.2g} px, max {drifts[-1]:.2g} px")
+
+# -------------------------------
+# Physics benchmark (--bench-physics [FILE])
+# -------------------------------
+# Canned sessions: balls kept in play, flipper press/release period (ticks)
+BENCH_SCRIPTS = [
+    {"name": "1 ball", "balls": 1, "flip_period": 40},
+    {"name": "3 balls", "balls": 3, "flip_period": 30},
+    {"name": "16 balls", "balls": 16, "flip_period": 24},
+]
+BENCH_TICKS = 6000
+BENCH_PEAK_TICKS = 600  # tracemalloc is slow: peak memory is sampled over fewer ticks
+BENCH_PATH = os.path.join(SAVE_DIR, "bench_physics.json")
+
+# subsystem -> (Game or BallSet method, tests it made given (game, args))
+BENCH_SUBSYSTEMS = {
+    "walls": ("collide_walls", lambda game, ball, cell: len(cell.walls) + len(cell.oneways)),
+    "slings": ("collide_slings", lambda game, ball, cell: len(cell.slings)),
+    "bumpers": ("collide_bumpers", lambda game, ball, cell: len(cell.bumpers)),
+    "targets": ("collide_targets", lambda game, ball, cell: len(cell.targets)),
+    "flippers": ("collide_flippers", lambda game, ball, cell, start, end: len(cell.flippers)),
+    "rollovers": ("sense_rollovers", lambda game, ball, cell: len(cell.rollovers)),
+    "ball pairs": ("collide_pairs", lambda game: game.balls.pair_tests),
+}
+
+def bench_drive(game, script, tick):
+    # One tick of a canned session: hold the plunger until it's full, swap
+    # flippers every flip_period ticks and keep exactly `balls` on the table
+    # (the one waiting in the shooter lane counts): drop balls in after drains,
+    # take off the extras a top-lane multiball adds
+    if game.balls_left <= 0:
+        game.new_game(1)
+    if game.in_shooter:
+        if not game.plunger_charging:
+            game.press("plunger", True)
+        elif game.plunger >= game.PLUNGER_MAX:
+            game.press("plunger", False)
+    phase = (tick // script["flip_period"]) % 2 == 0
+    if game.left_flipper.keydown != phase:
+        game.press("left", phase)
+    if game.right_flipper.keydown == phase:
+        game.press("right", not phase)
+    if len(game.balls) < script["balls"]:
+        game.add_multiball(script["balls"] - len(game.balls))
+    while len(game.balls) > script["balls"]:
+        game.balls.remove(next(b for b in reversed(game.balls.balls) if b is not game.ball))
+
+def bench_session(script, ticks, probe=None):
+    # Run one canned session; probe(game) can wrap methods before it starts
+    game = Game()
+    game.new_game(1)
+    if probe:
+        probe(game)
+    balls = substeps = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        bench_drive(game, script, tick)
+        game.update(DT)
+        balls += len(game.balls)
+        substeps += game.substeps
+    return time.perf_counter() - start, balls / ticks, substeps / ticks
+
+def bench_probe(stats, measure_peak):
+    # Wrap every subsystem method of a game to add up its calls' time,
+    # tests and (optionally) peak transient bytes into stats[subsystem]: how far
+    # traced memory rose above its starting point during the call, not how
+    # many bytes were allocated in total
+    def wrap(owner, name, subsystem, count):
+        method = getattr(owner, name)
+        entry = stats[subsystem]
+
+        def timed(*args):
+            if measure_peak:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                result = method(*args)
+                entry["peak_bytes"] += tracemalloc.get_traced_memory()[1] - before - peak_overhead
+            else:
+                start = time.perf_counter()
+                result = method(*args)
+                entry["seconds"] += time.perf_counter() - start
+            entry["tests"] += count(game_ref[0], *args)
+            return result
+        setattr(owner, name, timed)
+
+    def measured_nothing():
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[1] - before
+    # What the measuring itself adds to the peak, taken off every call
+    peak_overhead = min(measured_nothing() for _ in range(100)) if measure_peak else 0
+
+    game_ref = [None]
+    def probe(game):
+        game_ref[0] = game
+        for subsystem, (name, count) in BENCH_SUBSYSTEMS.items():
+            owner = game.balls if name == "collide_pairs" else game
+            wrap(owner, name, subsystem, count)
+    return probe
+
+def bench_physics(path=BENCH_PATH):
+    # Headless Game.update throughput per canned session, split by collision
+    # subsystem; prints a table and writes the numbers to `path` as JSON
+    results = []
+    for script in BENCH_SCRIPTS:
+        seconds, avg_balls, avg_substeps = bench_session(script, BENCH_TICKS)
+        assert abs(avg_balls - script["balls"]) < 0.05, f"{script['name']}: averaged {avg_balls:.2f} balls"
+
+        stats = {name: {"seconds": 0.0, "tests": 0, "peak_bytes": 0} for name in BENCH_SUBSYSTEMS}
+        bench_session(script, BENCH_TICKS, bench_probe(stats, False))
+        tracemalloc.start()
+        peak_stats = {name: {"seconds": 0.0, "tests": 0, "peak_bytes": 0} for name in BENCH_SUBSYSTEMS}
+        bench_session(script, BENCH_PEAK_TICKS, bench_probe(peak_stats, True))
+        tracemalloc.stop()
+
+        subsystems = {}
+        for name, entry in stats.items():
+            subsystems[name] = {
+                "tests_per_tick": entry["tests"] / BENCH_TICKS,
+                "us_per_tick": entry["seconds"] / BENCH_TICKS * 1e6,
+                "peak_transient_bytes_per_tick": peak_stats[name]["peak_bytes"] / BENCH_PEAK_TICKS,
+            }
+        results.append({
+            "script": script["name"],
+            "ticks": BENCH_TICKS,
+            "ticks_per_sec": BENCH_TICKS / seconds,
+            "avg_balls": avg_balls,
+            "substeps_per_tick": avg_substeps,
+            "subsystems": subsystems,
+        })
+
+        print(f"{script['name']}: {BENCH_TICKS / seconds:,.0f} ticks/s, {avg_balls:.1f} balls, "
+              f"{avg_substeps:.2f} substeps/tick")
+        for name, sub in subsystems.items():
+            print(f"  {name:<10} {sub['tests_per_tick']:8.1f} tests/tick {sub['us_per_tick']:9.1f} us/tick "
+                  f"{sub['peak_transient_bytes_per_tick']:9.0f} B/tick peak transient")
+
+    report = {
+        "version": VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "dt": DT,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {path}")
+
+# -------------------------------
+# Autoplay (--autoplay GAMES [FILE])
+# -------------------------------
+AUTOPLAY_PLUNGER = (0.8, 1.0)  # launch with this fraction of a full plunger (random per launch)
+AUTOPLAY_HOLD = 12  # ticks a flipper is held up after the last ball it was raised for
+AUTOPLAY_MARGIN = 6  # extra reach (px) the autoplayer flips for
+AUTOPLAY_MAX_TICKS = FPS * 60 * 20  # a game still going after 20 minutes counts as stuck
+AUTOPLAY_PATH = os.path.join(SAVE_DIR, "autoplay.json")
+AUTOPLAY_PERCENTILES = (0, 10, 25, 50, 75, 90, 100)
+
+class AutoPlayer:
+    # Plays a Game through Game.press like someone at the keyboard: launches
+    # with a random amount of plunger and raises a flipper when a ball's
+    # predicted path comes within reach of its swing. All its randomness
+    # comes from rng, so one seed always plays the same game.
+    def __init__(self, game, rng):
+        self.game = game
+        self.rng = rng
+        self.launch_power = 0.0  # plunger to release at
+        self.release_tick = {"left": 0, "right": 0}  # hold each flipper up until this tick
+        self.flips = 0
+
+    def will_reach(self, flipper, ball):
+        # True if the ball, flying free, comes within reach of any part of the
+        # flipper's swing in about the time the flipper takes to swing up
+        x0, y0, x1, y1 = flipper.bounds()
+        x, y, vx, vy = ball.p[0], ball.p[1], ball.v[0], ball.v[1]
+        reach = ball.r + flipper.width*0.5 + AUTOPLAY_MARGIN
+        up = flipper.base - flipper.swing
+        for _ in range(math.ceil(abs(flipper.swing) / flipper.max_speed / DT) + 1):
+            vy += GRAVITY*DT
+            x += vx*DT
+            y += vy*DT
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                for ang in (flipper.base, (flipper.base + up)*0.5, up):
+                    if flipper.gap(x, y, ang, reach)[0] < 0.0:
+                        return True
+        return False
+
+    def step(self):
+        # Press and release whatever this tick needs, before game.update
+        game = self.game
+        if game.in_shooter:
+            if not game.plunger_charging:
+                self.launch_power = game.PLUNGER_MAX * self.rng.uniform(*AUTOPLAY_PLUNGER)
+                game.press("plunger", True)
+            elif game.plunger >= self.launch_power:
+                game.press("plunger", False)
+
+        for control, flipper in (("left", game.left_flipper), ("right", game.right_flipper)):
+            for ball in game.balls:
+                if not (game.in_shooter and ball is game.ball) and self.will_reach(flipper, ball):
+                    self.release_tick[control] = game.tick + AUTOPLAY_HOLD
+                    break
+            down = game.tick < self.release_tick[control]
+            if down != flipper.keydown:
+                game.press(control, down)
+                if down:
+                    self.flips += 1
+
+def autoplay_game(seed):
+    # One headless game played by an AutoPlayer; returns its stats
+    game = Game()
+    player = AutoPlayer(game, random.Random(seed))
+    while game.balls_left > 0 and game.tick < AUTOPLAY_MAX_TICKS:
+        player.step()
+        game.update(DT)
+
+    left, right = game.drain_left[0], game.drain_right[0]
+    sides = {"left": 0, "center": 0, "right": 0}
+    for x in game.drains:
+        third = (x - left) / (right - left) * 3
+        sides["left" if third < 1 else "center" if third < 2 else "right"] += 1
+    return {
+        "seed": seed,
+        "score": game.score,
+        "ticks": game.tick,
+        "stuck": game.balls_left > 0,
+        "balls_lost": BALLS_PER_GAME + game.extra_awarded - game.balls_left,
+        "drains": sides,
+        "flips": player.flips,
+        "hits": {game.piece_names[piece]: n for piece, n in game.hits.items()},
+        "names": list(game.piece_names.values()),
+    }
+
+def percentile(ordered, p):
+    # Nearest-rank percentile p (0-100) of an already sorted list
+    return ordered[min(len(ordered) - 1, int(p / 100 * (len(ordered) - 1) + 0.5))]
+
+def autoplay(games, workers=None, seed=1, path=AUTOPLAY_PATH):
+    # Play `games` autoplayer games across a pool of `workers` processes
+    # (default: one per CPU); prints a summary and writes it to `path` as JSON
+    if games < 1:
+        raise ValueError(f"autoplay needs at least 1 game, got {games}")
+    workers = workers or os.cpu_count() or 1
+    seeds = range(seed, seed + games)
+    start = time.perf_counter()
+    if workers == 1:
+        results = list(map(autoplay_game, seeds))
+    else:
+        # Closed and joined rather than terminated: SDL in the workers catches SIGTERM
+        pool = multiprocessing.Pool(workers)
+        try:
+            results = pool.map(autoplay_game, seeds, chunksize=max(1, games // (workers * 8)))
+        finally:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+
+    scores = sorted(r["score"] for r in results)
+    ticks = sum(r["ticks"] for r in results)
+    drains = {side: sum(r["drains"][side] for r in results) for side in ("left", "center", "right")}
+    total_drains = sum(drains.values())
+    hits = {name: {"per_game": 0.0, "games_hit": 0.0} for name in results[0]["names"]}
+    for r in results:
+        for name, n in r["hits"].items():
+            hits[name]["per_game"] += n / games
+            hits[name]["games_hit"] += 1 / games
+
+    report = {
+        "version": VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "table": TABLE_PATH or "classic",
+        "games": games,
+        "seed": seed,
+        "workers": workers,
+        "seconds": elapsed,
+        "ticks_per_sec": ticks / elapsed,
+        "stuck_games": sum(1 for r in results if r["stuck"]),
+        "score": dict({"mean": sum(scores) / games},
+                      **{f"p{p}": percentile(scores, p) for p in AUTOPLAY_PERCENTILES}),
+        "game_seconds": ticks * DT / games,
+        "ball_seconds": ticks * DT / max(1, sum(r["balls_lost"] for r in results)),
+        "drains_per_minute": total_drains / (ticks * DT / 60),
+        "drain_sides": {side: n / max(1, total_drains) for side, n in drains.items()},
+        "flips_per_game": sum(r["flips"] for r in results) / games,
+        "hits": hits,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{games} games on {workers} workers in {elapsed:.1f} s ({report['ticks_per_sec']:,.0f} ticks/s), "
+          f"{report['stuck_games']} stuck")
+    print("score  " + "  ".join(f"p{p} {percentile(scores, p):,}" for p in AUTOPLAY_PERCENTILES))
+    print(f"game {report['game_seconds']:.0f} s, ball {report['ball_seconds']:.1f} s, "
+          f"{report['drains_per_minute']:.2f} drains/min (" +
+          ", ".join(f"{side} {share:.0%}" for side, share in report["drain_sides"].items()) + ")")
+    print(f"{report['flips_per_game']:.0f} flips/game")
+    for name, entry in hits.items():
+        print(f"  {name:<12} {entry['per_game']:8.1f} hits/game {entry['games_hit']:6.0%} of games")
+    print(f"wrote {path}")
+
+# -------------------------------
+# Replay playback (--replay FILE)
+# -------------------------------
+def replay_game(path):
+    # Re-simulate a recorded game as fast as possible and check its final score
+    replay = Replay.load(path)
+    game = Game()
+    if replay.table is not None and replay.table != game.table.digest:
+        print(f"{path} was recorded on another table ({replay.table[:12]}); this one is "
+              f"{TABLE_PATH or 'the built-in table'} ({game.table.digest[:12]}). Pass the same --table.")
+        return False
+    game.new_game(replay.start_balls)
+    events = replay.events
+    next_event = 0
+    start = time.perf_counter()
+    for tick in range(replay.ticks):
+        while next_event < len(events) and events[next_event][0] == tick:
+            _, control, down = events[next_event]
+            game.press(control, down)
+            next_event += 1
+        game.update(DT)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    ok = game.score == replay.score
+    print(f"{replay.ticks} ticks in {elapsed:.2f} s ({replay.ticks * DT / elapsed:.0f}x real time)")
+    print(f"score {game.score:,} (recorded {replay.score:,}): {'OK' if ok else 'MISMATCH'}")
+    return ok
+
 # -------------------------------
 # Main
 # -------------------------------
@@ -1005,4 +2278,17 @@ def main():
                 app.switch(SCENE_GAMEOVER)
 
 if __name__ == "__main__":
-    main()
+    if ARGS.bench_collision:
+        bench_collision()
+    elif ARGS.export_table:
+        with open(ARGS.export_table, "w", encoding="utf-8") as f:
+            # One line per part keeps the file short but still diffable
+            f.write("{\n" + ",\n".join(f"  {json.dumps(k)}: {json.dumps(v)}" for k, v in classic_table().items()) + "\n}\n")
+    elif ARGS.bench_physics is not None:
+        bench_physics(ARGS.bench_physics or BENCH_PATH)
+    elif ARGS.autoplay:
+        autoplay(ARGS.autoplay, ARGS.workers, ARGS.seed, ARGS.autoplay_file or AUTOPLAY_PATH)
+    elif ARGS.replay:
+        sys.exit(0 if replay_game(ARGS.replay) else 1)
+    else:
+        main()
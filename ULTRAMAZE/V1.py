@@ -145,6 +145,7 @@ def check_for_white_tile_collision():
             game_over = True
 
 # Game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
 
@@ -238,7 +239,7 @@ while running:
                     pygame.display.flip()
 
     pygame.display.flip()
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 # Quit Pygame
 pygame.quit()
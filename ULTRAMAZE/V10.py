@@ -145,6 +145,7 @@ def game_over_screen():
 
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
 
@@ -300,7 +301,7 @@ while running:
 
     # Refresh display
     pygame.display.flip()
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 pygame.quit()
 sys.exit()
@@ -156,6 +156,7 @@ def game_over_screen():
 
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
 
@@ -324,7 +325,7 @@ while running:
 
     # Refresh display
     pygame.display.flip()
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 pygame.quit()
 sys.exit()
@@ -201,6 +201,7 @@ def move_random_square():
         random_square_y -= random_square_speed
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
 
@@ -408,7 +409,7 @@ while running:
 
     # Refresh display
     pygame.display.flip()
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 pygame.quit()
 sys.exit()
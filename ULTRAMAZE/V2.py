@@ -62,6 +62,7 @@ def generate_maze():
 maze = generate_maze()
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
     
@@ -111,7 +112,7 @@ while running:
     pygame.display.flip()
 
     # Frame rate
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 # Quit Pygame
 pygame.quit()
@@ -82,6 +82,7 @@ def generate_maze():
 maze = generate_maze()
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
     
@@ -152,7 +153,7 @@ while running:
         pygame.display.flip()
 
     # Frame rate
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 # Quit Pygame
 pygame.quit()
@@ -114,6 +114,7 @@ def game_over_screen(elapsed_time):
     pygame.display.flip()
 
 # Game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
     
@@ -203,7 +204,7 @@ while running:
                     player_x, player_y = width // 2, height // 2
 
     # Frame rate
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 # Quit Pygame
 pygame.quit()
@@ -121,6 +121,7 @@ def game_over_screen(elapsed_time):
     pygame.display.flip()
 
 # Game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
     
@@ -211,7 +212,7 @@ while running:
                     player_x, player_y = width // 2, height // 2
 
     # Frame rate
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 # Quit Pygame
 pygame.quit()
@@ -128,6 +128,7 @@ def game_over_screen():
 
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
 
@@ -198,7 +199,7 @@ while running:
                 game_over = False
                 main_menu = True
 
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 pygame.quit()
 sys.exit()
@@ -122,6 +122,7 @@ def game_over_screen():
 
 
 # Main game loop
+clock = pygame.time.Clock()
 while running:
     screen.fill(BLACK)
 
@@ -203,7 +204,7 @@ while running:
 
     # Refresh display
     pygame.display.flip()
-    pygame.time.Clock().tick(60)
+    clock.tick(60)
 
 pygame.quit()
 sys.exit()
@@ -0,0 +1,90 @@
+"""Scrolling view for ULTRAMAZE's mega mazes.
+
+Camera follows the player and answers "is this on screen?" so only
+visible things get drawn. ChunkCache splits the maze into square chunks
+of cells, renders each chunk's walls to its own surface the first time it
+comes into view, and keeps only the most recently drawn chunks, so a
+2000x2000 maze never needs one giant surface.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+
+class Camera:
+    """Top-left world position of the view, kept inside the world."""
+
+    def __init__(self, view_x, view_y, view_width, view_height):
+        self.view = pygame.Rect(view_x, view_y, view_width, view_height)  # Where the world is drawn on screen
+        self.x = 0  # World position shown at the view's top-left corner
+        self.y = 0
+
+    def follow(self, target_x, target_y, world):
+        """Center the view on a world position, without showing past the edges of the `world` Rect."""
+        self.x = max(world.left, min(target_x - self.view.width // 2, world.right - self.view.width))
+        self.y = max(world.top, min(target_y - self.view.height // 2, world.bottom - self.view.height))
+
+    def to_screen(self, x, y):
+        """Screen position of a world position."""
+        return x - self.x + self.view.x, y - self.y + self.view.y
+
+    def is_visible(self, x, y, width, height):
+        """True if the world rectangle (x, y, width, height) overlaps the view."""
+        return (
+            x + width > self.x
+            and x < self.x + self.view.width
+            and y + height > self.y
+            and y < self.y + self.view.height
+        )
+
+
+class ChunkCache:
+    """Wall surfaces for chunk_cells x chunk_cells blocks of the maze, least recently drawn dropped first."""
+
+    def __init__(self, cell_size, chunk_cells=16, max_chunks=48, color=(255, 255, 255)):
+        self.cell_size = cell_size
+        self.chunk_cells = chunk_cells
+        self.chunk_pixels = chunk_cells * cell_size
+        self.max_chunks = max_chunks
+        self.color = color
+        self.grid = None
+        self.chunks = OrderedDict()  # (chunk_x, chunk_y) -> Surface
+        self.built = 0  # Chunks rendered (a miss each)
+
+    def _build(self, grid, chunk_x, chunk_y):
+        # 8-bit surface with black as the colorkey: a quarter of the memory of a display-format chunk
+        surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels), 0, 8)
+        surface.fill((0, 0, 0))
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        first_x = chunk_x * self.chunk_cells
+        first_y = chunk_y * self.chunk_cells
+        size = self.cell_size
+        for y in range(first_y, min(grid.height, first_y + self.chunk_cells)):
+            for x in range(first_x, min(grid.width, first_x + self.chunk_cells)):
+                if grid.is_wall(x, y):
+                    surface.fill(self.color, ((x - first_x) * size, (y - first_y) * size, size, size))
+        self.built += 1
+        return surface
+
+    def draw(self, screen, grid, camera, y_offset=0):
+        """Blit the chunks that overlap the camera's view. The grid's row 0 is at world y `y_offset`."""
+        if grid is not self.grid:
+            self.grid = grid
+            self.chunks.clear()
+        pixels = self.chunk_pixels
+        top = camera.y - y_offset
+        first_x, first_y = camera.x // pixels, top // pixels
+        last_x = (camera.x + camera.view.width - 1) // pixels
+        last_y = (top + camera.view.height - 1) // pixels
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                key = (chunk_x, chunk_y)
+                surface = self.chunks.get(key)
+                if surface is None:
+                    surface = self.chunks[key] = self._build(grid, chunk_x, chunk_y)
+                    if len(self.chunks) > self.max_chunks:
+                        self.chunks.popitem(last=False)
+                else:
+                    self.chunks.move_to_end(key)
+                screen.blit(surface, camera.to_screen(chunk_x * pixels, chunk_y * pixels + y_offset))
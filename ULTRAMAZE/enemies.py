@@ -0,0 +1,109 @@
+"""Random square enemies for ULTRAMAZE, stored as parallel arrays.
+
+Every square's position and target live in flat int arrays instead of one
+dict per enemy, and the whole group moves in one step() call and is
+tested against the player in one hits() call. That keeps the per-enemy
+cost to a few array reads and writes, so thousands of squares stay
+cheap.
+"""
+
+from array import array
+
+# Order the wandering squares try directions in before shuffling: up, down, left, right
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+class EnemySwarm:
+    """All random squares on the level: positions, targets and chase flags."""
+
+    def __init__(self):
+        self.x = array("i")
+        self.y = array("i")
+        self.target_x = array("i")
+        self.target_y = array("i")
+        self.chase = bytearray()  # 1 = follow the chase map, 0 = wander
+
+    def __len__(self):
+        return len(self.x)
+
+    def clear(self):
+        """Remove every square (a new level resets them)."""
+        for values in (self.x, self.y, self.target_x, self.target_y, self.chase):
+            del values[:]
+
+    def add(self, x, y, chase=False):
+        """Add a square at pixel (x, y); its first target is where it stands."""
+        self.x.append(x)
+        self.y.append(y)
+        self.target_x.append(x)
+        self.target_y.append(y)
+        self.chase.append(1 if chase else 0)
+
+    def set_chasers(self, count):
+        """Make the first `count` squares chase and the rest wander."""
+        for i in range(len(self.chase)):
+            self.chase[i] = 1 if i < count else 0
+
+    def any_chasing(self):
+        return any(self.chase)
+
+    def step(self, maze, cell_size, y_offset, speed, rng, chase_field=None):
+        """Move every square one tick toward its target, picking new targets where reached.
+
+        A wandering square that reaches its target shuffles the four
+        directions and takes the first open neighbour cell, the same rule
+        (and the same rng calls, in the same order) as the old per-enemy
+        move_single_random_square. A chasing square takes chase_field's next
+        step instead, falling back to wandering if there is none.
+        """
+        xs, ys = self.x, self.y
+        target_xs, target_ys = self.target_x, self.target_y
+        chase = self.chase
+        is_open = maze.is_open
+        shuffle = rng.shuffle
+
+        for i in range(len(xs)):
+            x = xs[i]
+            y = ys[i]
+            target_x = target_xs[i]
+            target_y = target_ys[i]
+
+            # If the square has reached its target, pick a new target
+            if x == target_x and y == target_y:
+                current_x = x // cell_size
+                current_y = (y - y_offset) // cell_size
+                step = chase_field.next_step(current_x, current_y) if chase[i] and chase_field else None
+                if step is not None:
+                    target_x = step[0] * cell_size
+                    target_y = step[1] * cell_size + y_offset
+                else:
+                    directions = list(DIRECTIONS)
+                    shuffle(directions)
+                    for dx, dy in directions:
+                        if is_open(current_x + dx, current_y + dy):
+                            target_x = (current_x + dx) * cell_size
+                            target_y = (current_y + dy) * cell_size + y_offset
+                            break
+                target_xs[i] = target_x
+                target_ys[i] = target_y
+
+            # Gradually move towards the target position
+            if x < target_x:
+                xs[i] = x + speed
+            elif x > target_x:
+                xs[i] = x - speed
+            if y < target_y:
+                ys[i] = y + speed
+            elif y > target_y:
+                ys[i] = y - speed
+
+    def hits(self, left, top, size, enemy_size):
+        """True if any square (enemy_size wide) overlaps the size x size box at (left, top)."""
+        min_x = left - enemy_size
+        max_x = left + size
+        min_y = top - enemy_size
+        max_y = top + size
+        for x, y in zip(self.x, self.y):
+            if min_x < x < max_x and min_y < y < max_y:
+                return True
+        return False
@@ -0,0 +1,70 @@
+"""Shared chase map for ULTRAMAZE enemies.
+
+One BFS from the player's cell gives every open cell its distance to the
+player. A chasing enemy just steps to the neighbour with the smallest
+distance, so hundreds of enemies cost the same per enemy as one, and the
+BFS only reruns when the player moves to a different cell.
+
+On a huge maze, give FlowField a max_steps: the BFS then only covers the
+cells within that many steps of the player, and enemies farther out see
+no step and keep wandering.
+"""
+
+import maze_gen
+
+
+class FlowField:
+    """Distance map toward a target cell, rebuilt only when the maze or target cell changes."""
+
+    def __init__(self, max_steps=None):
+        self.max_steps = max_steps  # None = the whole maze
+        self.grid = None
+        self.target = None
+        self.distances = None
+        self.rebuilds = 0  # How many times the BFS actually ran
+
+    def update(self, grid, target_x, target_y):
+        """Point the field at (target_x, target_y) on `grid`; cheap if nothing changed."""
+        if grid is self.grid and (target_x, target_y) == self.target:
+            return
+        if grid is self.grid and not grid.is_open(target_x, target_y):
+            return  # Target is off the grid or inside a wall; keep following the old map
+        self.grid = grid
+        self.target = (target_x, target_y)
+        self.distances = maze_gen.bfs_distances(grid, target_x, target_y, self.max_steps)
+        self.rebuilds += 1
+
+    def next_step(self, x, y):
+        """The neighbouring cell one step closer to the target, or None if there isn't one."""
+        if self.distances is None:
+            return None
+        width = self.grid.width
+        dist = self.distances
+        if isinstance(dist, dict):  # Bounded search: cells it didn't reach are out of range
+            return self._next_step_within(x, y)
+        i = y * width + x
+        best = dist[i]
+        if best <= 0:  # Already at the target, or cut off from it
+            return None
+        step = None
+        if x > 0 and 0 <= dist[i - 1] < best:
+            best, step = dist[i - 1], (x - 1, y)
+        if x < width - 1 and 0 <= dist[i + 1] < best:
+            best, step = dist[i + 1], (x + 1, y)
+        if y > 0 and 0 <= dist[i - width] < best:
+            best, step = dist[i - width], (x, y - 1)
+        if y < self.grid.height - 1 and 0 <= dist[i + width] < best:
+            best, step = dist[i + width], (x, y + 1)
+        return step
+
+    def _next_step_within(self, x, y):
+        width = self.grid.width
+        dist = self.distances
+        best = dist.get(y * width + x, 0)
+        step = None
+        for next_x, next_y in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= next_x < width:  # The dict only holds open cells inside the grid
+                steps = dist.get(next_y * width + next_x, -1)
+                if 0 <= steps < best:
+                    best, step = steps, (next_x, next_y)
+        return step
@@ -0,0 +1,27 @@
+"""Frame time statistics for ULTRAMAZE (median and 99th percentile)."""
+
+from collections import deque
+
+
+class FrameStats:
+    """Keeps the last `size` frame times (in seconds) and reports percentiles in ms."""
+
+    def __init__(self, size=1200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+
+    def percentile(self, pct):
+        """The pct-th percentile (0-100) of the kept samples in milliseconds, 0 if empty."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index] * 1000
+
+    def summary(self):
+        return f"p50 {self.percentile(50):.2f} ms, p99 {self.percentile(99):.2f} ms over {len(self.samples)} frames"
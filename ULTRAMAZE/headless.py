@@ -0,0 +1,95 @@
+"""Run ULTRAMAZE V13 without a window.
+
+Advances the game logic tick by tick from a key script (see key_script.py)
+and reports how many ticks per second it managed. Nothing is drawn unless
+--render is given (then frames go to SDL's dummy video driver).
+
+    python headless.py --ticks 10000 --seed 1
+    python headless.py --script run.keys --render
+    python headless.py --enemies 2000     # swarm benchmark
+    python headless.py --mega --render    # 2000x2000 scrolling maze
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Must be set before pygame opens a display
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import V13 as game
+from key_script import NO_KEYS, iter_keys, load_script
+
+
+def add_swarm(count):
+    """Put `count` extra wandering squares on the current level (spawn-safe cells only)."""
+    open_cells = game.current_level["open_cells"]
+    for _ in range(count):
+        game.random_squares.add(*game.cell_to_pixel(open_cells.pick(game.game_rng, game.enemy_spawn_min_steps)))
+
+
+def run(ticks, runs=None, seed=None, render=False, stop_on_game_over=True, swarm=0):
+    """Play `ticks` ticks of a new run and return a dict of results.
+
+    `runs` is a loaded key script (no keys are pressed once it runs out).
+    `swarm` adds that many wandering squares once level 1 is set up.
+    """
+    if seed is not None:
+        game.MAZE_SEED = seed
+    game.game_over = False
+    game.start_new_game()
+    script = iter_keys(runs or [])
+    if swarm:
+        game.update_game(NO_KEYS)  # Let level 1 set itself up first
+        add_swarm(swarm)
+
+    start = time.perf_counter()
+    tick = 0
+    while tick < ticks:
+        game.update_game(next(script, NO_KEYS))
+        if render:
+            game.screen.fill(game.BLACK)
+            game.draw_game()
+        tick += 1
+        if game.game_over and stop_on_game_over:
+            break
+    seconds = time.perf_counter() - start
+
+    return {
+        "ticks": tick,
+        "seconds": seconds,
+        "ticks_per_second": tick / seconds if seconds > 0 else float("inf"),
+        "level": game.level,
+        "game_over": game.game_over,
+        "seed": game.run_seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ULTRAMAZE V13 headless.")
+    parser.add_argument("--ticks", type=int, default=10_000, help="ticks to simulate (default 10000)")
+    parser.add_argument("--script", help="key script to play (recorded with V13.py --record FILE)")
+    parser.add_argument("--seed", type=int, help="run seed (overrides the script's seed)")
+    parser.add_argument("--render", action="store_true", help="also draw every tick (dummy video driver)")
+    parser.add_argument("--keep-going", action="store_true", help="keep ticking after game over")
+    parser.add_argument("--enemies", type=int, default=0, help="add this many wandering squares (swarm benchmark)")
+    parser.add_argument("--mega", type=int, nargs="?", const=2000, metavar="N", help="play an N x N scrolling maze (default 2000)")
+    args = parser.parse_args()
+    game.configure(mega=args.mega)
+
+    seed, runs = (None, [])
+    if args.script:
+        seed, runs = load_script(args.script)
+    if args.seed is not None:
+        seed = args.seed
+
+    result = run(args.ticks, runs, seed, render=args.render, stop_on_game_over=not args.keep_going, swarm=args.enemies)
+    print(f"{result['ticks']} ticks in {result['seconds']:.3f} s = {result['ticks_per_second']:.0f} ticks/s "
+          f"(seed {result['seed']}, level {result['level']}, {'game over' if result['game_over'] else 'still playing'})")
+    game.report_transitions()
+    if args.render:
+        print(f"Text cache: {game.text_cache.summary()}")
+
+
+if __name__ == "__main__":
+    main()
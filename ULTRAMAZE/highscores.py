@@ -0,0 +1,131 @@
+"""High-score store for ULTRAMAZE.
+
+Scores are (level, seconds) pairs: a higher level is better, and for the
+same level a shorter time is better.
+
+Highscores.txt stays what it always was, an append-only log of
+"level,time" lines (V1-V12 still read and append to it). Next to it,
+Highscores.json holds a snapshot of the best `limit` scores plus how many
+bytes of the log are already folded into them. Loading reads the snapshot
+and only the log lines written after it, then writes a new snapshot
+(compaction), so a log with millions of old runs is scanned once and never
+again. The snapshot is written to a temporary file and renamed over the old
+one, so a crash can't leave a half-written snapshot.
+
+After loading, the top scores live in memory: top() does no file I/O and
+is safe to call every frame.
+"""
+
+import heapq
+import json
+import os
+
+SNAPSHOT_VERSION = 1
+COMPACT_EVERY = 100  # Fold the log into the snapshot after this many new scores
+
+
+def score_key(score):
+    """Sort key: highest level first, then lowest time."""
+    level, seconds = score
+    return (-level, seconds)
+
+
+def parse_line(line):
+    """(level, seconds) from a "level,time" log line, or None if the line is malformed."""
+    try:
+        level, seconds = map(int, line.strip().split(","))
+    except ValueError:
+        return None
+    return level, seconds
+
+
+class HighScoreStore:
+    """The best `limit` scores, kept in memory and persisted as snapshot + append log."""
+
+    def __init__(self, log_path, snapshot_path=None, limit=10):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path or os.path.splitext(log_path)[0] + ".json"
+        self.limit = limit
+        self.scores = []  # Best first, at most `limit`
+        self.total_runs = 0  # Every score ever logged, not just the kept ones
+        self.log_bytes = 0  # Bytes of the log already folded into self.scores
+        self.pending = 0  # Scores appended since the last snapshot
+        self.load()
+
+    def top(self, limit=None):
+        """The best scores, best first (no file I/O)."""
+        return self.scores[: self.limit if limit is None else limit]
+
+    def _merge(self, scores):
+        self.scores = heapq.nsmallest(self.limit, list(self.scores) + list(scores), key=score_key)
+
+    def load(self):
+        """Read the snapshot, fold in any newer log lines and compact if there were some."""
+        self.scores = []
+        self.total_runs = 0
+        self.log_bytes = 0
+        try:
+            with open(self.snapshot_path, "r") as file:
+                snapshot = json.load(file)
+            if snapshot.get("version") == SNAPSHOT_VERSION:
+                self.scores = [tuple(score) for score in snapshot["scores"]]
+                self.total_runs = snapshot["total_runs"]
+                self.log_bytes = snapshot["log_bytes"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # No usable snapshot: rebuild from the whole log
+
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except OSError:
+            log_size = 0
+        if log_size < self.log_bytes:
+            # The log was replaced or cut down since the snapshot: trust the log alone
+            self.scores = []
+            self.total_runs = 0
+            self.log_bytes = 0
+
+        if log_size > self.log_bytes:
+            with open(self.log_path, "rb") as file:
+                file.seek(self.log_bytes)
+                # nsmallest keeps only `limit` scores while it streams the log
+                self._merge(heapq.nsmallest(self.limit, self._read_scores(file), key=score_key))
+            self.compact()
+        self.pending = 0
+
+    def _read_scores(self, file):
+        """Yield the scores from the rest of an open (binary) log file, counting them as runs."""
+        for raw in file:
+            score = parse_line(raw.decode("utf-8", "replace"))
+            if score is not None:
+                self.total_runs += 1
+                yield score
+
+    def add(self, level, seconds):
+        """Record a finished run: one line appended to the log, the top list updated in memory."""
+        with open(self.log_path, "a") as file:
+            file.write(f"{level},{seconds}\n")
+        self.total_runs += 1
+        self._merge([(level, seconds)])
+        self.pending += 1
+        if self.pending >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        """Write the snapshot (atomically) covering everything currently in the log."""
+        try:
+            self.log_bytes = os.path.getsize(self.log_path)
+        except OSError:
+            self.log_bytes = 0
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "scores": [list(score) for score in self.scores],
+            "total_runs": self.total_runs,
+            "log_bytes": self.log_bytes,
+        }
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(snapshot, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self.pending = 0
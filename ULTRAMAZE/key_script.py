@@ -0,0 +1,89 @@
+"""Scripted and recorded key input for ULTRAMAZE.
+
+A key script is a text file of run-length encoded key states, one line per
+run of identical ticks:
+
+    seed 1234       # optional: run seed the keys were recorded with
+    120 d           # hold D for 120 ticks
+    30 d shift      # D + Shift for 30 ticks
+    15 -            # nothing pressed for 15 ticks
+
+The game can record one with --record FILE, and headless.py plays one back.
+"""
+
+import pygame
+
+# Names used in scripts -> the pygame keys V13 reads
+KEY_NAMES = {
+    "w": pygame.K_w,
+    "a": pygame.K_a,
+    "s": pygame.K_s,
+    "d": pygame.K_d,
+    "up": pygame.K_UP,
+    "down": pygame.K_DOWN,
+    "left": pygame.K_LEFT,
+    "right": pygame.K_RIGHT,
+    "shift": pygame.K_LSHIFT,
+    "rshift": pygame.K_RSHIFT,
+}
+
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): keys[pygame.K_w] is True if W is held."""
+
+    def __init__(self, names=()):
+        self.names = tuple(sorted(names))
+        self.pressed = frozenset(KEY_NAMES[name] for name in self.names)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+NO_KEYS = ScriptedKeys()
+
+
+def load_script(path):
+    """Read a key script. Returns (seed or None, [(ticks, ScriptedKeys), ...])."""
+    seed = None
+    runs = []
+    with open(path, "r") as file:
+        for line in file:
+            words = line.split("#", 1)[0].split()
+            if not words:
+                continue
+            if words[0] == "seed":
+                seed = int(words[1])
+                continue
+            names = [] if words[1:] == ["-"] else words[1:]
+            runs.append((int(words[0]), ScriptedKeys(names)))
+    return seed, runs
+
+
+def iter_keys(runs):
+    """Yield one ScriptedKeys per tick from a loaded script."""
+    for ticks, keys in runs:
+        for _ in range(ticks):
+            yield keys
+
+
+class KeyRecorder:
+    """Collects the keys held on each tick and saves them as a key script."""
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.runs = []  # [ticks, names] pairs
+
+    def record(self, keys):
+        """Add one tick of input (the object returned by pygame.key.get_pressed())."""
+        names = tuple(name for name, key in KEY_NAMES.items() if keys[key])
+        if self.runs and self.runs[-1][1] == names:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, names])
+
+    def save(self, path):
+        with open(path, "w") as file:
+            if self.seed is not None:
+                file.write(f"seed {self.seed}\n")
+            for ticks, names in self.runs:
+                file.write(f"{ticks} {' '.join(names) if names else '-'}\n")
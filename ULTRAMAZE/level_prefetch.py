@@ -0,0 +1,50 @@
+"""Background building of the next ULTRAMAZE level.
+
+While a level is being played, the next one (maze, goal, spawn spots) is
+built on a worker thread. When the player reaches the goal the game just
+takes the finished result, so no generation happens inside that frame.
+"""
+
+import threading
+
+
+class LevelPrefetcher:
+    """Runs `build(*args)` on a worker thread and hands the result over later."""
+
+    def __init__(self, build):
+        self.build = build
+        self.hits = 0  # take() found a matching build
+        self.misses = 0  # take() had nothing for that key and the caller built it itself
+        self._key = None
+        self._thread = None
+        self._box = None
+
+    def start(self, key, *args):
+        """Start building the level identified by `key`, replacing any pending build."""
+        box = {}
+
+        def work():
+            box["level"] = self.build(*args)
+
+        self._key = key
+        self._box = box
+        self._thread = threading.Thread(target=work, name="level-prefetch", daemon=True)
+        self._thread.start()
+
+    def take(self, key):
+        """Return the built level for `key` (waiting if it is still running), or None."""
+        if self._thread is None or self._key != key:
+            self.misses += 1
+            return None
+        self._thread.join()
+        level = self._box.get("level")  # Missing if the build raised
+        self._key = self._thread = self._box = None
+        if level is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return level
+
+    def cancel(self):
+        """Forget any pending build (e.g. when a new run starts)."""
+        self._key = self._thread = self._box = None
@@ -0,0 +1,125 @@
+"""Level table for ULTRAMAZE V13.
+
+LEVELS maps a level number to what changes when that level starts.
+Every key is optional:
+
+    "message"           text shown at the top (left out = keep the previous message)
+    "enemies"           clear the random squares and spawn this many (left out = keep the current squares)
+    "chasers"           how many random squares chase the player instead of wandering
+    "Ycoin" / "Bcoin"   True to place a yellow / blue coin
+    "Ybarrier" / "Bbarrier"   True to put a yellow / blue barrier around the goal
+    "stationary_enemy"  True / False to turn the goal guard on or off
+
+This module has no pygame dependency, so the table can be checked
+without a display.
+"""
+
+LEVELS = {
+    1: {"message": "Move to the red square.", "enemies": 0, "stationary_enemy": False},
+    2: {"message": " The clock is ticking."},
+    3: {"message": "There is a special surprise at level 6."},
+    4: {"message": "It's just a simple maze game."},
+    5: {"message": "Just keep going."},
+    6: {"message": "There it is!", "Ycoin": True},
+    7: {"message": "You gotta get the coins! Right?", "Ycoin": True},
+    8: {"message": "I can't remeber... are the coins optional?", "Ycoin": True},
+    9: {"message": "I guess it is up to you.", "Ycoin": True},
+    10: {"message": "Hope you got all the coins...", "Ycoin": True},
+    11: {"message": "You greedy little gamer."},
+    12: {"message": "wow, Level 12. Look at you go."},
+    13: {"message": "This is an unlucky level.", "Bcoin": True, "Ybarrier": True},
+    14: {"message": "Better not touch those guys.", "enemies": 1, "Bcoin": True},
+    15: {"message": "I bet you can go faster...", "enemies": 1, "Bcoin": True},
+    16: {"message": "The game ends at Level 100 but you wont make it past Level 50.", "enemies": 1, "Bcoin": True},
+    17: {"message": "The game gets really hard on level 25.", "enemies": 1, "Bcoin": True},
+    18: {"message": "Hey! You know you can press SHIFT to go fatser right?", "enemies": 1},
+    19: {"message": "Can you really make it to the end?", "enemies": 1},
+    20: {"message": "Oh this guy is new.", "enemies": 2, "Bbarrier": True, "stationary_enemy": True},
+    21: {"message": "Wow, level 21? I underestimated you.", "enemies": 2, "stationary_enemy": False},
+    22: {"message": "Are you starting to sweat?", "enemies": 2, "stationary_enemy": False},
+    23: {"message": "Just give up already.", "enemies": 2, "stationary_enemy": True},
+    24: {"message": "You'll never beat the next level.", "enemies": 2, "stationary_enemy": True},
+    25: {"message": "Oh, you made it this far? Must be a fluke.", "enemies": 2, "stationary_enemy": True},
+    26: {"message": "Good luck, you'll need it.", "enemies": 3, "stationary_enemy": True},
+    27: {"message": "You're just lucky, aren't you?", "enemies": 3, "stationary_enemy": True},
+    28: {"message": "This is where most players quit.", "enemies": 0},  # 28-30 clear the squares without spawning new ones
+    29: {"message": "I wouldn't bother if I were you.", "enemies": 0},
+    30: {"message": "Admit it, you're impressed with yourself.", "enemies": 0},
+    31: {"message": "Even I didn't think this level was possible.", "enemies": 4},
+    32: {"message": "Your keyboard must be crying by now.", "enemies": 4},
+    33: {"message": "Did you just get lucky or are you skilled?", "enemies": 4},
+    34: {"message": "I hope you saved your game.", "enemies": 4},
+    35: {"message": "Get on the floor and bark for me.", "enemies": 5},
+    36: {"message": "Just kidding, it's not that kind of game.", "enemies": 5},
+    37: {"enemies": 5},  # Keeps level 36's message
+    38: {"message": "This is just cruel, even for me.", "enemies": 5},
+    39: {"message": "You're making the game look easy.", "enemies": 5},
+    40: {"message": "Only a few make it past here.", "enemies": 6},
+    41: {"message": "Can you feel the pressure?", "enemies": 6},
+    42: {"message": "You're probably cheating, aren't you?", "enemies": 6},
+    43: {"message": "This level is just unfair.", "enemies": 6},
+    44: {"message": "Don't blame me, you chose this.", "enemies": 6},
+    45: {"message": "Are you even trying anymore?", "enemies": 7},
+    46: {"message": "The game won't let you win.", "enemies": 7},
+    47: {"message": "You're just delaying the inevitable.", "enemies": 7},
+    48: {"message": "Even the developers didn't beat this.", "enemies": 7},
+    49: {"message": "Remember when I said you wouldn't make it past LVL 50?", "enemies": 7},
+    50: {"message": "Perfectly balanced.", "enemies": 0},
+    51: {"message": "Never bet against a gamer...", "enemies": 8},
+    52: {"message": "The clock is Still ticking...", "enemies": 8},
+    53: {"message": "There is a special surprise at level 66.", "enemies": 8},
+    54: {"message": "This level will break you.", "enemies": 8},
+    55: {"message": "You're still here? Impressive.", "enemies": 8},
+    56: {"message": "-", "enemies": 9},
+    57: {"message": "-", "enemies": 9},
+    58: {"message": "-?", "enemies": 9},
+    59: {"message": "-", "enemies": 9},
+    60: {"message": "-", "enemies": 10},
+    61: {"message": "You greedy little gamer.", "enemies": 10},
+    62: {"message": "wow, Level 12. Look at you go.", "enemies": 10},
+    63: {"message": "This is an unlucky level.", "enemies": 10},
+    64: {"message": "The game gets really hard on level 25.", "enemies": 10},
+    65: {"message": "I bet you can go faster...", "enemies": 11},
+    66: {"message": "The game ends at Level 100 but you wont make it past Level 50.", "enemies": 11},
+    67: {"message": "Can you feel the walls getting smaller?", "enemies": 11},
+    68: {"message": "Hey! You know you can press SHIFT to go fatser right?", "enemies": 11},
+    69: {"message": "Nice", "enemies": 0},
+    70: {"message": "The game should be getting harder now.", "enemies": 12},
+    71: {"message": "The game should be getting harder now.", "enemies": 12},
+    72: {"message": "The game should be getting harder now.", "enemies": 12},
+    73: {"message": "The game should be getting harder now.", "enemies": 12},
+    74: {"message": "The game should be getting harder now.", "enemies": 12},
+    75: {"message": "The game should be getting harder now.", "enemies": 13},
+    76: {"message": "The game should be getting harder now.", "enemies": 13},
+    77: {"message": "The game should be getting harder now.", "enemies": 13},
+    78: {"message": "The game should be getting harder now.", "enemies": 13},
+    79: {"message": "The game should be getting harder now.", "enemies": 13},
+    80: {"message": "The game should be getting harder now.", "enemies": 14},
+    81: {"message": "The game should be getting harder now.", "enemies": 14},
+    82: {"message": "The game should be getting harder now.", "enemies": 14},
+    83: {"message": "The game should be getting harder now.", "enemies": 14},
+    84: {"message": "The game should be getting harder now.", "enemies": 14},
+    85: {"message": "The game should be getting harder now.", "enemies": 15},
+    86: {"message": "The game should be getting harder now.", "enemies": 15},
+    87: {"message": "The game should be getting harder now.", "enemies": 15},
+    88: {"message": "The game should be getting harder now.", "enemies": 15},
+    89: {"message": "The game should be getting harder now.", "enemies": 15},
+    90: {"message": "The game should be getting harder now.", "enemies": 20},
+    91: {"message": "The game should be getting harder now.", "enemies": 20},
+    92: {"message": "The game should be getting harder now.", "enemies": 20},
+    93: {"message": "The game should be getting harder now.", "enemies": 20},
+    94: {"message": "The game should be getting harder now.", "enemies": 20},
+    95: {"message": "The game should be getting harder now.", "enemies": 20},
+    96: {"message": "The game should be getting harder now.", "enemies": 20},
+    97: {"message": "The game should be getting harder now.", "enemies": 20},
+    98: {"message": "only two more levels", "enemies": 20},
+    99: {"message": "The game should be getting harder now.", "enemies": 20},
+    100: {"message": "If you beat this level, you win! Too bad you cant.", "chasers": 20},  # Every square left from level 99 hunts the player
+}
+
+FINAL_LEVEL = max(LEVELS)
+
+
+def level_settings(level):
+    """Settings for `level` (an empty dict for levels without an entry)."""
+    return LEVELS.get(level, {})
@@ -0,0 +1,368 @@
+"""Maze generation for ULTRAMAZE.
+
+Mazes live in a MazeGrid: one byte per cell in a flat bytearray
+(1 = wall, 0 = open), indexed as y * width + x. The carver is an
+explicit-stack depth-first search, so there is no recursion limit, and
+every function takes its own random.Random so a seed always gives the
+same maze.
+
+Very large mazes (the --mega mode) are packed into a BitMazeGrid after
+generation, one bit per cell, so a 2000x2000 maze takes 500 KB instead
+of 4 MB while it is played. Their spawn cells come from a
+SampledCellIndex, which draws random cells from the grid instead of
+listing every open one.
+"""
+
+import random
+from array import array
+from itertools import compress
+
+WALL = 1
+OPEN = 0
+_OPEN_FLAGS = bytes([1, 0]) + bytes(254)  # bytes.translate table: open (0) -> 1, wall (1) -> 0
+
+
+class MazeGrid:
+    """A width x height grid of wall/open cells backed by a bytearray."""
+
+    def __init__(self, width, height, fill=WALL):
+        self.width = width
+        self.height = height
+        self.cells = bytearray([fill]) * (width * height)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_wall(self, x, y):
+        """True if (x, y) is a wall. Cells outside the grid are not walls."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == WALL
+
+    def is_open(self, x, y):
+        """True if (x, y) is inside the grid and open."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == OPEN
+
+    def set_open(self, x, y):
+        self.cells[y * self.width + x] = OPEN
+
+    def clear_area(self, center_x, center_y, radius):
+        """Open every cell in the square of `radius` around a cell (clipped to the grid)."""
+        for y in range(max(0, center_y - radius), min(self.height, center_y + radius + 1)):
+            start = y * self.width
+            for x in range(max(0, center_x - radius), min(self.width, center_x + radius + 1)):
+                self.cells[start + x] = OPEN
+
+    def packed(self):
+        """A BitMazeGrid copy of this grid (one bit per cell)."""
+        return BitMazeGrid.from_cells(self.width, self.height, self.cells)
+
+
+class BitMazeGrid:
+    """Read-mostly wall grid packed 8 cells per byte (bit i % 8 of byte i // 8 is cell i).
+
+    Has the same cell methods as MazeGrid (is_wall, is_open, set_open,
+    clear_area), but no `cells`, so generation and the open-cell index work
+    on a MazeGrid that is packed afterwards.
+    """
+
+    def __init__(self, width, height, bits):
+        self.width = width
+        self.height = height
+        self.bits = bits
+
+    @classmethod
+    def from_cells(cls, width, height, cells):
+        """Pack a 0/1 bytearray. Each of the 8 bit planes is a C-speed slice, OR-ed together as big ints."""
+        padded = bytes(cells) + bytes(-len(cells) % 8)
+        packed = 0
+        for bit in range(8):
+            packed |= int.from_bytes(padded[bit::8], "little") << bit
+        return cls(width, height, bytearray(packed.to_bytes(len(padded) // 8, "little")))
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_wall(self, x, y):
+        """True if (x, y) is a wall. Cells outside the grid are not walls."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            return self.bits[i >> 3] >> (i & 7) & 1 == WALL
+        return False
+
+    def is_open(self, x, y):
+        """True if (x, y) is inside the grid and open."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            return self.bits[i >> 3] >> (i & 7) & 1 == OPEN
+        return False
+
+    def set_open(self, x, y):
+        i = y * self.width + x
+        self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def clear_area(self, center_x, center_y, radius):
+        """Open every cell in the square of `radius` around a cell (clipped to the grid)."""
+        for y in range(max(0, center_y - radius), min(self.height, center_y + radius + 1)):
+            for x in range(max(0, center_x - radius), min(self.width, center_x + radius + 1)):
+                self.set_open(x, y)
+
+
+def level_seed(run_seed, level):
+    """Seed for one level of a run, so a run seed replays the same mazes."""
+    return (run_seed * 1_000_003 + level) & 0xFFFFFFFF
+
+
+def carve_maze(grid, start_x, start_y, rng):
+    """Carve passages into an all-wall grid with an iterative recursive-backtracker.
+
+    Passages are cut two cells at a time from (start_x, start_y), the same
+    layout the old recursive carve_path produced.
+    """
+    width, height = grid.width, grid.height
+    cells = grid.cells
+    rand = rng.random
+    start = start_y * width + start_x
+    cells[start] = OPEN
+    stack = [start]
+    push, pop = stack.append, stack.pop
+    step_down = 2 * width
+
+    while stack:
+        i = stack[-1]
+        x = i % width
+        # Collect the unvisited cells two steps away
+        choices = []
+        if i >= step_down and cells[i - step_down]:
+            choices.append(-width)
+        if i + step_down < len(cells) and cells[i + step_down]:
+            choices.append(width)
+        if x >= 2 and cells[i - 2]:
+            choices.append(-1)
+        if x + 2 < width and cells[i + 2]:
+            choices.append(1)
+
+        if not choices:
+            pop()
+            continue
+
+        d = choices[int(rand() * len(choices))] if len(choices) > 1 else choices[0]
+        cells[i + d] = OPEN
+        cells[i + d + d] = OPEN
+        push(i + d + d)
+
+    return grid
+
+
+def generate_maze(width, height, start=(1, 1), seed=None, rng=None):
+    """Build and carve a new width x height maze. Pass a seed (or rng) for a repeatable maze."""
+    if rng is None:
+        rng = random.Random(seed)
+    grid = MazeGrid(width, height)
+    return carve_maze(grid, start[0], start[1], rng)
+
+
+def random_open_cell(grid, rng):
+    """Pick a random open cell. Returns (x, y), or None if the grid has no open cells."""
+    cells = grid.cells
+    # Rejection sampling is fast on a carved maze (about half the cells are open)...
+    for _ in range(64):
+        i = rng.randrange(len(cells))
+        if cells[i] == OPEN:
+            return i % grid.width, i // grid.width
+    # ...but fall back to an exact pick so a nearly solid grid can't spin forever
+    open_cells = [i for i, c in enumerate(cells) if c == OPEN]
+    if not open_cells:
+        return None
+    i = rng.choice(open_cells)
+    return i % grid.width, i // grid.width
+
+
+def bfs_distances(grid, start_x, start_y, max_steps=None):
+    """Steps from (start_x, start_y) to every cell through open cells, as a flat array (-1 = unreachable).
+
+    With `max_steps`, the search stops that many steps out and returns a
+    dict {cell index: steps} of just the cells it reached, so a huge maze
+    costs only the area around the start (and any grid type works).
+    """
+    if max_steps is not None:
+        return _bfs_distances_within(grid, start_x, start_y, max_steps)
+    width = grid.width
+    cells = grid.cells
+    last_row = len(cells) - width
+    dist = array("i", [-1]) * len(cells)
+    if not grid.is_open(start_x, start_y):
+        return dist
+
+    start = start_y * width + start_x
+    dist[start] = 0
+    frontier = [start]
+    steps = 0
+    while frontier:
+        steps += 1
+        next_frontier = []
+        add = next_frontier.append
+        for i in frontier:
+            x = i % width
+            if x > 0 and cells[i - 1] == OPEN and dist[i - 1] < 0:
+                dist[i - 1] = steps
+                add(i - 1)
+            if x < width - 1 and cells[i + 1] == OPEN and dist[i + 1] < 0:
+                dist[i + 1] = steps
+                add(i + 1)
+            if i >= width and cells[i - width] == OPEN and dist[i - width] < 0:
+                dist[i - width] = steps
+                add(i - width)
+            if i < last_row and cells[i + width] == OPEN and dist[i + width] < 0:
+                dist[i + width] = steps
+                add(i + width)
+        frontier = next_frontier
+    return dist
+
+
+def _bfs_distances_within(grid, start_x, start_y, max_steps):
+    width = grid.width
+    is_open = grid.is_open
+    if not is_open(start_x, start_y):
+        return {}
+    dist = {start_y * width + start_x: 0}
+    frontier = [(start_x, start_y)]
+    for steps in range(1, max_steps + 1):
+        next_frontier = []
+        for x, y in frontier:
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                i = ny * width + nx
+                if i not in dist and is_open(nx, ny):
+                    dist[i] = steps
+                    next_frontier.append((nx, ny))
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return dist
+
+
+class OpenCellIndex:
+    """The open cells of a finished maze, gathered once so every spawn is one random pick.
+
+    `safe_zones` is a list of (x, y, radius) squares (the player start and
+    the goal) that are left out of the spawn cells.
+    """
+
+    def __init__(self, grid, safe_zones=()):
+        self.width = grid.width
+        # Flip the cells so open ones are truthy and let compress() pick their indexes at C speed
+        self.open_cells = array("I", compress(range(len(grid.cells)), grid.cells.translate(_OPEN_FLAGS)))
+
+        blocked = set()
+        for center_x, center_y, radius in safe_zones:
+            for y in range(max(0, center_y - radius), min(grid.height, center_y + radius + 1)):
+                for x in range(max(0, center_x - radius), min(grid.width, center_x + radius + 1)):
+                    blocked.add(y * grid.width + x)
+        if blocked:
+            self.spawn_cells = array("I", [i for i in self.open_cells if i not in blocked])
+        else:
+            self.spawn_cells = self.open_cells
+
+        self.distances = None  # Optional bfs_distances() map (array, or dict from a bounded search) used by min_steps
+        self._far_cells = {}  # min_steps -> spawn cells at least that far away
+
+    def set_distances(self, distances):
+        """Use a new distance map (e.g. from the player's cell) for min_steps picks."""
+        self.distances = distances
+        self._far_cells.clear()
+
+    def far_cells(self, min_steps):
+        """Spawn cells at least `min_steps` BFS steps away on the distance map (built once per min_steps).
+
+        With a dict from a bounded search, cells it never reached count as far away.
+        """
+        if min_steps not in self._far_cells:
+            dist = self.distances
+            if isinstance(dist, dict):
+                far = [i for i in self.spawn_cells if dist.get(i, min_steps) >= min_steps]
+            else:
+                far = [i for i in self.spawn_cells if dist[i] >= min_steps]
+            self._far_cells[min_steps] = array("I", far)
+        return self._far_cells[min_steps]
+
+    def pick(self, rng, min_steps=0):
+        """Random (x, y) spawn cell, optionally at least `min_steps` away on the distance map.
+
+        Falls back to any spawn cell, then any open cell, when the stricter
+        pool is empty. Returns None only if the maze has no open cells.
+        """
+        pool = self.spawn_cells
+        if min_steps > 0 and self.distances is not None and self.far_cells(min_steps):
+            pool = self.far_cells(min_steps)
+        if not pool:
+            pool = self.open_cells
+            if not pool:
+                return None
+        i = pool[int(rng.random() * len(pool))]
+        return i % self.width, i // self.width
+
+
+class SampledCellIndex:
+    """OpenCellIndex.pick() for huge mazes, without a list of the open cells.
+
+    Each pick draws random cells until one is open, outside the safe zones
+    and (for min_steps) far enough away on the distance map. About half of
+    a carved maze is open, so that takes a few draws, and nothing but the
+    grid itself is kept: the index costs no memory however big the maze.
+    Works on a MazeGrid or a BitMazeGrid.
+    """
+
+    tries = 1000  # Random draws per pick before falling back to a scan of the whole grid
+
+    def __init__(self, grid, safe_zones=()):
+        self.grid = grid
+        self.width = grid.width
+        self.safe_zones = list(safe_zones)
+        self.distances = None  # Optional bfs_distances() map used by min_steps
+
+    def set_distances(self, distances):
+        """Use a new distance map (e.g. from the player's cell) for min_steps picks."""
+        self.distances = distances
+
+    def _spawnable(self, x, y):
+        for center_x, center_y, radius in self.safe_zones:
+            if abs(x - center_x) <= radius and abs(y - center_y) <= radius:
+                return False
+        return True
+
+    def _far(self, i, min_steps):
+        dist = self.distances
+        if isinstance(dist, dict):
+            return dist.get(i, min_steps) >= min_steps  # Cells a bounded search never reached are far away
+        return dist[i] >= min_steps
+
+    def _sample(self, rng, accept):
+        """Random open (x, y) that accept(x, y, i) allows (None: any open cell), or None if there is none."""
+        width, is_open = self.width, self.grid.is_open
+        size = width * self.grid.height
+        for _ in range(self.tries):
+            i = int(rng.random() * size)
+            x, y = i % width, i // width
+            if is_open(x, y) and (accept is None or accept(x, y, i)):
+                return x, y
+        # Almost everything was rejected: one pass over the grid, keeping a uniform pick of the matches
+        found, matches = None, 0
+        for i in range(size):
+            x, y = i % width, i // width
+            if is_open(x, y) and (accept is None or accept(x, y, i)):
+                matches += 1
+                if int(rng.random() * matches) == 0:
+                    found = (x, y)
+        return found
+
+    def pick(self, rng, min_steps=0):
+        """Random (x, y) spawn cell, optionally at least `min_steps` away on the distance map.
+
+        Falls back to any spawn cell, then any open cell, like OpenCellIndex.pick.
+        """
+        checks = [lambda x, y, i: self._spawnable(x, y), None]
+        if min_steps > 0 and self.distances is not None:
+            checks.insert(0, lambda x, y, i: self._spawnable(x, y) and self._far(i, min_steps))
+        for accept in checks:
+            cell = self._sample(rng, accept)
+            if cell is not None:
+                return cell
+        return None
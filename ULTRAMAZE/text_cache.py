@@ -0,0 +1,42 @@
+"""Rendered-text cache for ULTRAMAZE.
+
+font.render is by far the slowest thing in a HUD frame, and almost every
+string on screen (level, coin counts, menus, the top 10) is the same as
+last frame. TextCache keeps the rendered surfaces keyed by
+(font, text, color) and drops the least recently used one when full.
+"""
+
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of font.render results, with hit/miss counters."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()  # (font, text, color) -> Surface, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        """Same as font.render(text, True, color), but reuses the surface for repeated text."""
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self.surfaces)} cached"